@@ -1,12 +1,32 @@
+import glob
 import json
 import os
+import sys
 
-from typing import Dict, Iterable, Tuple
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
 
+import numpy as np
 import pandas as pd
 import psycopg2
+import psycopg2.pool
 import streamlit as st
 
+# `streamlit run dashboard/app.py` only puts dashboard/ on the path.
+ROOT_STR = str(Path(__file__).resolve().parents[1])
+if ROOT_STR not in sys.path:
+    sys.path.insert(0, ROOT_STR)
+
+from src.igfx_bot.trade_sql import (  # noqa: E402
+    EXIT_TS_JSON_PATHS,
+    PNL_JSON_PATHS,
+    exit_ts_sql,
+    json_text_sql,
+    pnl_sql,
+)
+
 st.set_page_config(page_title="IGFX-Bot Dashboard", layout="wide")
 st.title("📈 IGFX-Bot — Monitoring Dashboard")
 
@@ -22,15 +42,86 @@ def load_backtest_metrics(path: str) -> dict:
         return json.load(fh)
 
 
-@st.cache_data(show_spinner=False)
+# Trade frames are cached by reference (no pickle round-trip per rerun), so the
+# returned objects are shared across sessions and must be treated as read-only.
+_TRADES_CACHE_TTL_SECONDS = 300
+
+
+# Low-cardinality label columns; as categoricals each row is a small integer
+# code and `.isin` / the filter options work on the (few) categories.
+_TRADE_LABEL_COLUMNS = ("symbol", "side")
+
+
+def _categorize_trade_labels(df: pd.DataFrame) -> pd.DataFrame:
+    """Store the symbol/side columns as `category` (no-op if already categorical)."""
+
+    for column in _TRADE_LABEL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    return df
+
+
+# Prices, sizes and PnL carry ~5 significant decimals, well within float32;
+# halving their width halves what every filter, chart and Arrow round-trip
+# has to move. Aggregates are computed in float64 (see the stats block).
+_TRADE_FLOAT_COLUMNS = ("size", "entry_price", "exit_price", "sl", "tp", "pnl", "duration_min")
+
+
+def _downcast_trade_numbers(df: pd.DataFrame) -> pd.DataFrame:
+    """Store metric columns as float32 and ``trade_id`` as int32 when it fits."""
+
+    present = [column for column in _TRADE_FLOAT_COLUMNS if column in df.columns]
+    df[present] = df[present].astype("float32")
+    if "trade_id" in df.columns and pd.api.types.is_integer_dtype(df["trade_id"]):
+        ids = df["trade_id"]
+        if ids.empty or (ids.min() >= np.iinfo(np.int32).min and ids.max() <= np.iinfo(np.int32).max):
+            df["trade_id"] = ids.astype("int32")
+    return df
+
+
+def _parquet_sidecar_path(path: str) -> str:
+    """Parquet cache location for ``path``, keyed by its modification time."""
+
+    return f"{path}.{os.stat(path).st_mtime_ns}.parquet"
+
+
+@st.cache_resource(show_spinner=False, ttl=_TRADES_CACHE_TTL_SECONDS)
 def load_historical_trades(path: str) -> pd.DataFrame:
-    """Load a CSV file with historical trades."""
+    """Load a CSV file with historical trades.
+
+    The parsed, sorted frame is persisted next to the CSV as a Parquet sidecar
+    so cold starts skip CSV parsing and dtype inference. Editing the CSV
+    changes its mtime and therefore the sidecar name.
+    """
 
     if not os.path.exists(path):
         return pd.DataFrame()
 
+    cache_path = _parquet_sidecar_path(path)
+    if os.path.exists(cache_path):
+        try:
+            return _downcast_trade_numbers(_categorize_trade_labels(pd.read_parquet(cache_path)))
+        except (ImportError, OSError, ValueError):
+            pass
+
     df = pd.read_csv(path, parse_dates=["timestamp"])
     df.sort_values("timestamp", inplace=True)
+    _categorize_trade_labels(df)
+    _downcast_trade_numbers(df)
+
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        df.to_parquet(tmp_path, compression="zstd")
+        os.replace(tmp_path, cache_path)
+    except (ImportError, OSError, ValueError):  # pragma: no cover - no pyarrow / read-only dir
+        return df
+
+    for stale in glob.glob(f"{glob.escape(path)}.*.parquet"):
+        if stale != cache_path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
     return df
 
 
@@ -57,137 +148,348 @@ def _pg_connection_kwargs() -> Dict[str, object]:
     return {k: v for k, v in params.items() if v}
 
 
-@st.cache_data(show_spinner=False)
-def load_timescale_trades(conn_items: Iterable[Tuple[str, object]]) -> pd.DataFrame:
-    """Load trades from the TimescaleDB `trades` table if configured."""
+_PG_POOL_MAX_CONNECTIONS = 4
 
-    if not conn_items:
-        return pd.DataFrame()
 
-    conn_kwargs = dict(conn_items)
+@st.cache_resource(show_spinner=False)
+def _get_pg_pool(conn_items: Iterable[Tuple[str, object]]) -> psycopg2.pool.ThreadedConnectionPool:
+    """One connection pool per DSN, shared by every rerun and browser session.
 
-    query = """
-        SELECT
-            id AS trade_id,
-            ts AS timestamp,
-            symbol,
-            side,
-            size,
-            entry AS entry_price,
-            sl,
-            tp,
-            deal_ref,
-            raw
-        FROM trades
-        ORDER BY timestamp;
+    Sessions run in UTC so timestamps without an offset in ``trades.raw`` and
+    the dates derived from ``trades.ts`` match the UTC filter bounds.
     """
 
-    with psycopg2.connect(**conn_kwargs) as conn:
-        df = pd.read_sql_query(query, conn, parse_dates=["timestamp"])
+    return psycopg2.pool.ThreadedConnectionPool(
+        1,
+        _PG_POOL_MAX_CONNECTIONS,
+        keepalives=1,
+        keepalives_idle=30,
+        options="-c TimeZone=UTC",
+        **dict(conn_items),
+    )
 
-    if "raw" in df.columns:
-        # Normalize JSON payload if possible; on some drivers jsonb returns str.
-        df["raw"] = df["raw"].apply(
-            lambda value: json.loads(value) if isinstance(value, str) else value
-        )
 
-        def _extract_pnl(raw_payload):
-            if not isinstance(raw_payload, dict):
-                return None
-            candidates = (
-                "profitAndLoss",
-                "profitAndLossAmount",
-                "pnl",
-                "PnL",
-            )
-            for key in candidates:
-                if key in raw_payload and raw_payload[key] is not None:
-                    pnl_value = raw_payload[key]
-                    if isinstance(pnl_value, dict) and "value" in pnl_value:
-                        pnl_value = pnl_value["value"]
-                    try:
-                        return float(pnl_value)
-                    except (TypeError, ValueError):
-                        continue
-            return None
-
-        df["pnl"] = df.get("pnl")
-        df.loc[df["pnl"].isna(), "pnl"] = df.loc[df["pnl"].isna(), "raw"].apply(
-            _extract_pnl
-        )
+@contextmanager
+def _pg_connection(conn_items: Iterable[Tuple[str, object]]):
+    """Borrow a pooled connection for one transaction.
 
-        def _extract_exit_ts(raw_payload):
-            if not isinstance(raw_payload, dict):
-                return None
-            for key in ("closeTime", "closedTime", "exitTime"):
-                if key in raw_payload and raw_payload[key]:
-                    return raw_payload[key]
-            return None
-
-        exit_ts = df["raw"].apply(_extract_exit_ts)
-        if exit_ts.notna().any():
-            exit_ts = pd.to_datetime(exit_ts, errors="coerce")
-            df.loc[exit_ts.notna(), "exit_timestamp"] = exit_ts[exit_ts.notna()]
-            if "exit_timestamp" in df.columns:
-                df.loc[exit_ts.notna(), "duration_min"] = (
-                    (df.loc[exit_ts.notna(), "exit_timestamp"] - df.loc[exit_ts.notna(), "timestamp"])
-                    .dt.total_seconds()
-                    .div(60)
-                )
+    Connections are not in autocommit mode because the trades query streams
+    through a named (server-side) cursor, which needs an open transaction.
+    ``with conn`` commits or rolls back without closing; connections that
+    died underneath us are discarded instead of returned to the pool.
+    """
 
-    df.sort_values("timestamp", inplace=True)
-    return df
+    pool = _get_pg_pool(conn_items)
+    conn = pool.getconn()
+    broken = False
+    try:
+        with conn:
+            yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        pool.putconn(conn, close=broken or bool(conn.closed))
+
+
+_TRADES_WHERE = """
+    WHERE t.ts >= %(start_ts)s
+      AND t.ts < %(end_ts)s
+      AND t.symbol = ANY(%(symbols)s)
+      AND t.side = ANY(%(sides)s)
+    ORDER BY t.ts
+"""
 
+# PnL, exit time and duration are extracted server-side so the (large) `raw`
+# JSONB payload never has to be shipped to and decoded by the dashboard. The
+# PnL expression is the one the `trades_daily` aggregate sums (see trade_sql).
+_TRADES_QUERY = """
+    SELECT
+        t.id AS trade_id,
+        t.ts AS timestamp,
+        t.symbol,
+        t.side,
+        t.size,
+        t.entry AS entry_price,
+        t.sl,
+        t.tp,
+        t.deal_ref,
+        x.pnl,
+        x.exit_timestamp,
+        (EXTRACT(EPOCH FROM (x.exit_timestamp - t.ts)) / 60.0)::float8 AS duration_min
+    FROM trades t
+    CROSS JOIN LATERAL (
+        SELECT
+            {pnl} AS pnl,
+            {exit_ts} AS exit_timestamp
+    ) x
+""".format(
+    pnl=pnl_sql(),
+    exit_ts=exit_ts_sql(),
+) + _TRADES_WHERE
+
+_TEXT_PNL_COLUMNS = [f"pnl_{i}" for i in range(len(PNL_JSON_PATHS))]
+_TEXT_EXIT_TS_COLUMNS = [f"exit_ts_{i}" for i in range(len(EXIT_TS_JSON_PATHS))]
+
+# Fallback used when a payload still trips one of the server-side casts (e.g.
+# an out-of-range date). Only the candidate fields are returned, as text, and
+# parsed client-side; the full `raw` payload still stays in the database.
+_TRADES_TEXT_QUERY = """
+    SELECT
+        t.id AS trade_id,
+        t.ts AS timestamp,
+        t.symbol,
+        t.side,
+        t.size,
+        t.entry AS entry_price,
+        t.sl,
+        t.tp,
+        t.deal_ref,
+        {candidates}
+    FROM trades t
+""".format(
+    candidates=",\n        ".join(
+        [
+            f"{json_text_sql(path)} AS {column}"
+            for path, column in zip(PNL_JSON_PATHS, _TEXT_PNL_COLUMNS)
+        ]
+        + [
+            f"{json_text_sql(path)} AS {column}"
+            for path, column in zip(EXIT_TS_JSON_PATHS, _TEXT_EXIT_TS_COLUMNS)
+        ]
+    )
+) + _TRADES_WHERE
+
+
+# Facets come from the real-time `trades_daily` aggregate: a few rows per
+# symbol/side/day instead of a scan of every (compressed) `trades` chunk.
+_TRADE_FACETS_QUERY = """
+    SELECT
+        min(bucket) AS min_ts,
+        max(bucket) AS max_ts,
+        array_agg(DISTINCT symbol ORDER BY symbol) AS symbols,
+        array_agg(DISTINCT side ORDER BY side) AS sides
+    FROM trades_daily;
+"""
 
-metrics_path = os.path.join("samples", "sample_backtest_report.json")
-trades_path = os.path.join("samples", "historical_trades.csv")
+# Same facets from the raw table, for databases without the aggregate.
+_RAW_TRADE_FACETS_QUERY = """
+    SELECT
+        min(ts) AS min_ts,
+        max(ts) AS max_ts,
+        array_agg(DISTINCT symbol ORDER BY symbol) AS symbols,
+        array_agg(DISTINCT side ORDER BY side) AS sides
+    FROM trades;
+"""
 
-metrics = load_backtest_metrics(metrics_path)
 
-conn_kwargs = _pg_connection_kwargs()
-data_sources = ["Sample CSV"]
-if conn_kwargs:
-    data_sources.append("TimescaleDB (live)")
+def _fetch_trade_facets(conn_items: Iterable[Tuple[str, object]], query: str):
+    with _pg_connection(conn_items) as conn:
+        with conn.cursor() as cur:
+            cur.execute(query)
+            return cur.fetchone()
 
-st.sidebar.header("Data Source")
-selected_source = st.sidebar.selectbox("Trades", data_sources)
 
-load_error = None
-if selected_source == "TimescaleDB (live)":
+@st.cache_data(show_spinner=False, ttl=_TRADES_CACHE_TTL_SECONDS)
+def load_timescale_trade_facets(conn_items: Iterable[Tuple[str, object]]) -> dict:
+    """Fetch the date bounds and distinct symbols/sides used to build the filters."""
+
+    if not conn_items:
+        return {}
+
     try:
-        trades = load_timescale_trades(tuple(sorted(conn_kwargs.items())))
-    except Exception as exc:  # pragma: no cover - surfaced to UI
-        trades = pd.DataFrame()
-        load_error = str(exc)
-else:
-    trades = load_historical_trades(trades_path)
+        min_ts, max_ts, symbols, sides = _fetch_trade_facets(conn_items, _TRADE_FACETS_QUERY)
+    except psycopg2.errors.UndefinedTable:
+        min_ts, max_ts, symbols, sides = _fetch_trade_facets(conn_items, _RAW_TRADE_FACETS_QUERY)
 
-st.markdown(
+    if min_ts is None:
+        return {}
+
+    return {
+        "min_date": min_ts.astimezone(timezone.utc).date(),
+        "max_date": max_ts.astimezone(timezone.utc).date(),
+        "symbols": symbols or [],
+        "sides": sides or [],
+    }
+
+
+_TRADE_COLUMNS = [
+    "trade_id",
+    "timestamp",
+    "symbol",
+    "side",
+    "size",
+    "entry_price",
+    "sl",
+    "tp",
+    "deal_ref",
+    "pnl",
+    "exit_timestamp",
+    "duration_min",
+]
+_TRADE_TEXT_COLUMNS = _TRADE_COLUMNS[:-3] + _TEXT_PNL_COLUMNS + _TEXT_EXIT_TS_COLUMNS
+_TRADES_FETCH_ROWS = 50_000
+
+
+# Fixed dtypes for the numeric columns, so every batch (even one where a
+# nullable column is entirely NULL) comes out identical and pandas never has
+# to infer types from Python objects. `trade_id` stays int64: it is a
+# BIGSERIAL and batches must agree on one type.
+_TRADE_NUMERIC_DTYPES = {
+    "trade_id": "int64",
+    **{column: "float32" for column in _TRADE_FLOAT_COLUMNS if column in _TRADE_COLUMNS},
+}
+
+
+def _coerce_trade_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize timestamp columns to UTC datetimes and numeric columns to fixed dtypes."""
+
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    df["exit_timestamp"] = pd.to_datetime(df["exit_timestamp"], utc=True)
+    return df.astype(_TRADE_NUMERIC_DTYPES)
+
+
+def _trades_frame(rows: List[tuple]) -> pd.DataFrame:
+    """Build a typed DataFrame from a batch of `_TRADES_QUERY` rows."""
+
+    return _coerce_trade_dtypes(pd.DataFrame.from_records(rows, columns=_TRADE_COLUMNS))
+
+
+def _trades_frame_from_text(rows: List[tuple]) -> pd.DataFrame:
+    """Build a typed DataFrame from `_TRADES_TEXT_QUERY` rows, parsing in pandas."""
+
+    df = pd.DataFrame.from_records(rows, columns=_TRADE_TEXT_COLUMNS)
+
+    pnl_candidates = df[_TEXT_PNL_COLUMNS]
+    df["pnl"] = pnl_candidates.apply(pd.to_numeric, errors="coerce").bfill(axis=1).iloc[:, 0]
+
+    exit_candidates = df[_TEXT_EXIT_TS_COLUMNS]
+    df["exit_timestamp"] = pd.to_datetime(
+        exit_candidates.apply(pd.to_datetime, errors="coerce", utc=True, format="mixed")
+        .bfill(axis=1)
+        .iloc[:, 0],
+        utc=True,
+    )
+
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    df["duration_min"] = (df["exit_timestamp"] - df["timestamp"]).dt.total_seconds() / 60
+    return _coerce_trade_dtypes(df[_TRADE_COLUMNS])
+
+
+def _fetch_trade_chunks(conn_items: Iterable[Tuple[str, object]], query: str, params: dict, to_frame):
+    # A named cursor keeps the result set on the server; rows are pulled in
+    # bounded batches and converted to typed frames as they arrive, so peak
+    # client memory tracks the batch size rather than the full result.
+    chunks = []
+    with _pg_connection(conn_items) as conn:
+        with conn.cursor(name="trades_stream") as cur:
+            cur.execute(query, params)
+            while True:
+                rows = cur.fetchmany(_TRADES_FETCH_ROWS)
+                if not rows:
+                    break
+                chunks.append(to_frame(rows))
+    return chunks
+
+
+@st.cache_resource(show_spinner=False, ttl=_TRADES_CACHE_TTL_SECONDS)
+def load_timescale_trades(
+    conn_items: Iterable[Tuple[str, object]],
+    start_ts: datetime,
+    end_ts: datetime,
+    symbols: Tuple[str, ...],
+    sides: Tuple[str, ...],
+) -> pd.DataFrame:
+    """Load trades in ``[start_ts, end_ts)`` for the given symbols/sides from TimescaleDB.
+
+    Filtering happens in the WHERE clause so only the chunks covering the
+    selected window are scanned.
     """
-This dashboard surfaces sample analytics for IGFX-Bot. Replace the sample files in the
-`samples/` directory with your own exports (CSV/JSON) or wire the loaders to your TimescaleDB
-instance for live monitoring.
+
+    if not conn_items:
+        return pd.DataFrame()
+
+    params = {
+        "start_ts": start_ts,
+        "end_ts": end_ts,
+        "symbols": list(symbols),
+        "sides": list(sides),
+    }
+
+    try:
+        chunks = _fetch_trade_chunks(conn_items, _TRADES_QUERY, params, _trades_frame)
+    except psycopg2.DataError:
+        chunks = _fetch_trade_chunks(
+            conn_items, _TRADES_TEXT_QUERY, params, _trades_frame_from_text
+        )
+
+    if not chunks:
+        return _categorize_trade_labels(_trades_frame([]))
+    # Rows arrive already ordered by the query's ORDER BY. Categories are
+    # assigned after concatenation so every chunk shares one set.
+    return _categorize_trade_labels(pd.concat(chunks, ignore_index=True))
+
+
+_DAILY_PNL_QUERY = """
+    SELECT bucket, sum(trades) AS trades, sum(pnl) AS pnl
+    FROM trades_daily
+    WHERE bucket >= %(start_ts)s
+      AND bucket < %(end_ts)s
+      AND symbol = ANY(%(symbols)s)
+      AND side = ANY(%(sides)s)
+    GROUP BY bucket
+    ORDER BY bucket;
 """
-)
 
-if load_error:
-    st.sidebar.error(f"Unable to load trades from TimescaleDB: {load_error}")
 
-st.sidebar.header("Filters")
+@st.cache_data(show_spinner=False, ttl=_TRADES_CACHE_TTL_SECONDS)
+def load_timescale_daily_pnl(
+    conn_items: Iterable[Tuple[str, object]],
+    start_ts: datetime,
+    end_ts: datetime,
+    symbols: Tuple[str, ...],
+    sides: Tuple[str, ...],
+) -> pd.DataFrame:
+    """Per-day PnL from the `trades_daily` continuous aggregate (empty if it does not exist)."""
+
+    if not conn_items:
+        return pd.DataFrame()
+
+    params = {
+        "start_ts": start_ts,
+        "end_ts": end_ts,
+        "symbols": list(symbols),
+        "sides": list(sides),
+    }
+
+    try:
+        with _pg_connection(conn_items) as conn:
+            with conn.cursor() as cur:
+                cur.execute(_DAILY_PNL_QUERY, params)
+                rows = cur.fetchall()
+    except psycopg2.errors.UndefinedTable:
+        return pd.DataFrame()
+
+    df = pd.DataFrame.from_records(rows, columns=["bucket", "trades", "pnl"])
+    df["bucket"] = pd.to_datetime(df["bucket"], utc=True)
+    df["pnl"] = df["pnl"].astype("float64")
+    return df
+
+
+def _sidebar_filters(
+    available_symbols: List[str],
+    available_sides: List[str],
+    min_date: date,
+    max_date: date,
+) -> Tuple[List[str], List[str], date, date]:
+    """Render the symbol/side/date widgets and return the current selection."""
 
-if not trades.empty:
-    available_symbols = sorted(trades["symbol"].unique())
     selected_symbols = st.sidebar.multiselect(
         "Symbols", options=available_symbols, default=available_symbols
     )
-
-    available_sides = sorted(trades["side"].unique())
     selected_sides = st.sidebar.multiselect(
         "Sides", options=available_sides, default=available_sides
     )
-
-    min_date = trades["timestamp"].min().date()
-    max_date = trades["timestamp"].max().date()
     selected_date_range = st.sidebar.date_input(
         "Date range",
         value=(min_date, max_date),
@@ -200,25 +502,97 @@ if not trades.empty:
     else:
         start_date = end_date = selected_date_range
 
-    filtered_trades = trades[
-        trades["symbol"].isin(selected_symbols)
-        & trades["side"].isin(selected_sides)
-        & trades["timestamp"].dt.date.between(start_date, end_date)
-    ]
+    return selected_symbols, selected_sides, start_date, end_date
+
+
+metrics_path = os.path.join("samples", "sample_backtest_report.json")
+trades_path = os.path.join("samples", "historical_trades.csv")
+
+metrics = load_backtest_metrics(metrics_path)
+
+conn_kwargs = _pg_connection_kwargs()
+data_sources = ["Sample CSV"]
+if conn_kwargs:
+    data_sources.append("TimescaleDB (live)")
+
+st.sidebar.header("Data Source")
+selected_source = st.sidebar.selectbox("Trades", data_sources)
+
+st.markdown(
+    """
+This dashboard surfaces sample analytics for IGFX-Bot. Replace the sample files in the
+`samples/` directory with your own exports (CSV/JSON) or wire the loaders to your TimescaleDB
+instance for live monitoring.
+"""
+)
+
+st.sidebar.header("Filters")
+
+daily_pnl = pd.DataFrame()
+if selected_source == "TimescaleDB (live)":
+    # The filter widgets are built from a cheap facets query so the selected
+    # window is known before the (potentially large) trades query is issued.
+    conn_items = tuple(sorted(conn_kwargs.items()))
+    filtered_trades = pd.DataFrame()
+    try:
+        facets = load_timescale_trade_facets(conn_items)
+        if facets:
+            selected_symbols, selected_sides, start_date, end_date = _sidebar_filters(
+                facets["symbols"], facets["sides"], facets["min_date"], facets["max_date"]
+            )
+            # `trades.ts` is TIMESTAMPTZ: pass UTC-aware bounds so the window
+            # does not shift with the server's session time zone.
+            start_ts = datetime.combine(start_date, time.min, tzinfo=timezone.utc)
+            end_ts = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=timezone.utc)
+            filtered_trades = load_timescale_trades(
+                conn_items, start_ts, end_ts, tuple(selected_symbols), tuple(selected_sides)
+            )
+            daily_pnl = load_timescale_daily_pnl(
+                conn_items, start_ts, end_ts, tuple(selected_symbols), tuple(selected_sides)
+            )
+        else:
+            st.sidebar.info("No trades have been recorded in TimescaleDB yet.")
+    except Exception as exc:  # pragma: no cover - surfaced to UI
+        st.sidebar.error(f"Unable to load trades from TimescaleDB: {exc}")
 else:
-    st.sidebar.info("Add a CSV file with historical trades to populate this dashboard.")
-    filtered_trades = trades
+    trades = load_historical_trades(trades_path)
+
+    if not trades.empty:
+        selected_symbols, selected_sides, start_date, end_date = _sidebar_filters(
+            trades["symbol"].cat.categories.tolist(),
+            trades["side"].cat.categories.tolist(),
+            trades["timestamp"].min().date(),
+            trades["timestamp"].max().date(),
+        )
+
+        # Compare on datetime64 bounds (end exclusive) rather than building a
+        # Series of Python `date` objects on every rerun.
+        tz = trades["timestamp"].dt.tz
+        start_ts = pd.Timestamp(start_date, tz=tz)
+        end_ts = pd.Timestamp(end_date, tz=tz) + pd.Timedelta(days=1)
+        filtered_trades = trades[
+            trades["symbol"].isin(selected_symbols)
+            & trades["side"].isin(selected_sides)
+            & (trades["timestamp"] >= start_ts)
+            & (trades["timestamp"] < end_ts)
+        ]
+    else:
+        st.sidebar.info("Add a CSV file with historical trades to populate this dashboard.")
+        filtered_trades = trades
 
 
 st.header("Performance Overview")
 
 if metrics:
     metrics_section = metrics.get("metrics", {})
+    final_value, return_pct, win_rate, sharpe = (
+        metrics_section.get(key, 0) for key in ("final_value", "return_pct", "win_rate", "sharpe")
+    )
     metrics_cols = st.columns(4)
-    metrics_cols[0].metric("Final Value", f"${metrics_section.get('final_value', 0):,.0f}")
-    metrics_cols[1].metric("Return", f"{metrics_section.get('return_pct', 0):.2f}%")
-    metrics_cols[2].metric("Win Rate", f"{metrics_section.get('win_rate', 0) * 100:.1f}%")
-    metrics_cols[3].metric("Sharpe Ratio", f"{metrics_section.get('sharpe', 0):.2f}")
+    metrics_cols[0].metric("Final Value", f"${final_value:,.0f}")
+    metrics_cols[1].metric("Return", f"{return_pct:.2f}%")
+    metrics_cols[2].metric("Win Rate", f"{win_rate * 100:.1f}%")
+    metrics_cols[3].metric("Sharpe Ratio", f"{sharpe:.2f}")
 
     st.caption(
         f"Strategy: {metrics.get('strategy')} — Symbol: {metrics.get('symbol')} — Timeframe: {metrics.get('timeframe')}"
@@ -238,16 +612,26 @@ if not filtered_trades.empty:
         filtered_trades["duration_min"]
     )
 
+    # Work on one float64 buffer: NaN marks trades without realized PnL and
+    # counts as 0 in the aggregates, as before.
+    pnl_values = (
+        filtered_trades["pnl"].to_numpy(dtype="float64", na_value=np.nan)
+        if pnl_available
+        else np.empty(0)
+    )
+    pnl_missing = np.isnan(pnl_values)
+    has_pnl = pnl_available and not pnl_missing.all()
+
     stats_cols = st.columns(5)
     stats_cols[0].metric("Trades", f"{total_trades}")
 
-    if pnl_available and filtered_trades["pnl"].notna().any():
-        pnl_series = filtered_trades["pnl"].fillna(0)
-        winning_trades = pnl_series[pnl_series > 0]
-        win_pct = (len(winning_trades) / total_trades) * 100 if total_trades else 0
+    if has_pnl:
+        pnl_filled = np.where(pnl_missing, 0.0, pnl_values)
+        win_pct = int((pnl_filled > 0).sum()) / total_trades * 100
+        pnl_total = pnl_filled.sum()
         stats_cols[1].metric("Win %", f"{win_pct:.1f}%")
-        stats_cols[2].metric("Avg. PnL", f"${pnl_series.mean():,.2f}")
-        stats_cols[3].metric("Total PnL", f"${pnl_series.sum():,.2f}")
+        stats_cols[2].metric("Avg. PnL", f"${pnl_total / total_trades:,.2f}")
+        stats_cols[3].metric("Total PnL", f"${pnl_total:,.2f}")
     else:
         stats_cols[1].metric("Win %", "N/A")
         stats_cols[2].metric("Avg. PnL", "N/A")
@@ -260,9 +644,9 @@ if not filtered_trades.empty:
     else:
         stats_cols[4].metric("Avg. Duration", "N/A")
 
-    if pnl_available and filtered_trades["pnl"].notna().any():
-        best_trade = filtered_trades.loc[filtered_trades["pnl"].idxmax()]
-        worst_trade = filtered_trades.loc[filtered_trades["pnl"].idxmin()]
+    if has_pnl:
+        best_trade = filtered_trades.iloc[int(np.nanargmax(pnl_values))]
+        worst_trade = filtered_trades.iloc[int(np.nanargmin(pnl_values))]
         st.markdown(
             f"**Best Trade:** {best_trade['symbol']} {best_trade['side']} PnL ${best_trade['pnl']:,.2f} | "
             f"**Worst Trade:** {worst_trade['symbol']} {worst_trade['side']} PnL ${worst_trade['pnl']:,.2f}"
@@ -272,23 +656,31 @@ if not filtered_trades.empty:
             "PnL metrics are hidden because the data source does not include realized profit/loss yet."
         )
 
-    if pnl_available and filtered_trades["pnl"].notna().any():
-        pnl_chart = filtered_trades.copy()
-        pnl_chart["cum_pnl"] = pnl_chart["pnl"].fillna(0).cumsum()
-        pnl_chart.set_index("timestamp", inplace=True)
+    if has_pnl:
+        # Chart straight from the arrays; no need to copy the whole frame to
+        # add one column.
+        trade_times = pd.DatetimeIndex(filtered_trades["timestamp"], name="timestamp")
 
         chart_col1, chart_col2 = st.columns(2)
         with chart_col1:
-            st.area_chart(pnl_chart["cum_pnl"], use_container_width=True)
+            st.area_chart(
+                pd.Series(pnl_filled.cumsum(), index=trade_times, name="cum_pnl"),
+                use_container_width=True,
+            )
         with chart_col2:
-            st.bar_chart(filtered_trades.set_index("timestamp")["pnl"], use_container_width=True)
+            st.bar_chart(
+                pd.Series(pnl_values, index=trade_times, name="pnl"),
+                use_container_width=True,
+            )
+
+    if not daily_pnl.empty and daily_pnl["pnl"].notna().any():
+        st.subheader("Daily PnL")
+        st.bar_chart(daily_pnl.set_index("bucket")["pnl"], use_container_width=True)
+        st.caption("Rolled up per symbol and side by the `trades_daily` continuous aggregate.")
 
     st.subheader("Historical Trades")
-    display_trades = filtered_trades.set_index("timestamp")
-    if "raw" in display_trades.columns:
-        display_trades = display_trades.drop(columns=["raw"])
     st.dataframe(
-        display_trades,
+        filtered_trades.set_index("timestamp"),
         use_container_width=True,
     )
 else:
@@ -1,6 +1,7 @@
--- Enable TimescaleDB and create hypertable + trades table
-CREATE EXTENSION IF NOT EXISTS timescaledb;
+-- Enable TimescaleDB and create hypertables, compression policies and the daily trades rollup.
+-- Keep in sync with igfx_bot.db.SCHEMA_STATEMENTS.
 
+CREATE EXTENSION IF NOT EXISTS timescaledb;
 CREATE TABLE IF NOT EXISTS candles (
     symbol TEXT NOT NULL,
     time   TIMESTAMPTZ NOT NULL,
@@ -15,7 +16,7 @@ SELECT create_hypertable('candles','time', if_not_exists => TRUE);
 CREATE INDEX IF NOT EXISTS idx_candles_symbol_time ON candles(symbol, time DESC);
 
 CREATE TABLE IF NOT EXISTS trades (
-    id BIGSERIAL PRIMARY KEY,
+    id BIGSERIAL NOT NULL,
     ts TIMESTAMPTZ NOT NULL DEFAULT now(),
     epic TEXT NOT NULL,
     symbol TEXT NOT NULL,
@@ -25,5 +26,74 @@ CREATE TABLE IF NOT EXISTS trades (
     sl DOUBLE PRECISION,
     tp DOUBLE PRECISION,
     deal_ref TEXT,
-    raw JSONB
+    raw JSONB,
+    PRIMARY KEY(id, ts)
+);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = 'trades'
+    ) THEN
+        ALTER TABLE trades DROP CONSTRAINT IF EXISTS trades_pkey;
+        ALTER TABLE trades ADD PRIMARY KEY (id, ts);
+        PERFORM create_hypertable('trades', 'ts', migrate_data => TRUE);
+    END IF;
+END $$;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM timescaledb_information.hypertables
+        WHERE hypertable_name = 'candles' AND compression_enabled
+    ) THEN
+        ALTER TABLE candles SET (
+            timescaledb.compress,
+            timescaledb.compress_segmentby = 'symbol',
+            timescaledb.compress_orderby = 'time DESC'
+        );
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM timescaledb_information.hypertables
+        WHERE hypertable_name = 'trades' AND compression_enabled
+    ) THEN
+        ALTER TABLE trades SET (
+            timescaledb.compress,
+            timescaledb.compress_segmentby = 'symbol',
+            timescaledb.compress_orderby = 'ts DESC'
+        );
+    END IF;
+END $$;
+SELECT add_compression_policy('candles', INTERVAL '7 days', if_not_exists => TRUE);
+SELECT add_compression_policy('trades', INTERVAL '7 days', if_not_exists => TRUE);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS trades_daily
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    t.symbol,
+    t.side,
+    time_bucket(INTERVAL '1 day', t.ts) AS bucket,
+    count(*) AS trades,
+    sum(COALESCE(CASE WHEN (t.raw #>> '{profitAndLoss}') ~ '^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$' THEN (t.raw #>> '{profitAndLoss}')::float8 END,
+        CASE WHEN (t.raw #>> '{profitAndLoss,value}') ~ '^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$' THEN (t.raw #>> '{profitAndLoss,value}')::float8 END,
+        CASE WHEN (t.raw #>> '{profitAndLossAmount}') ~ '^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$' THEN (t.raw #>> '{profitAndLossAmount}')::float8 END,
+        CASE WHEN (t.raw #>> '{profitAndLossAmount,value}') ~ '^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$' THEN (t.raw #>> '{profitAndLossAmount,value}')::float8 END,
+        CASE WHEN (t.raw #>> '{pnl}') ~ '^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$' THEN (t.raw #>> '{pnl}')::float8 END,
+        CASE WHEN (t.raw #>> '{pnl,value}') ~ '^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$' THEN (t.raw #>> '{pnl,value}')::float8 END,
+        CASE WHEN (t.raw #>> '{PnL}') ~ '^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$' THEN (t.raw #>> '{PnL}')::float8 END,
+        CASE WHEN (t.raw #>> '{PnL,value}') ~ '^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$' THEN (t.raw #>> '{PnL,value}')::float8 END)) AS pnl
+FROM trades t
+GROUP BY t.symbol, t.side, bucket
+WITH NO DATA;
+
+-- The policy below only refreshes the last 30 days; materialize everything
+-- older (including trades migrated into the hypertable) once.
+CALL refresh_continuous_aggregate('trades_daily', NULL, NULL);
+
+SELECT add_continuous_aggregate_policy(
+    'trades_daily',
+    start_offset => INTERVAL '30 days',
+    end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '1 hour',
+    if_not_exists => TRUE
 );
@@ -0,0 +1,18 @@
+"""Optional Numba support.
+
+``njit`` compiles with Numba when it is installed and is a no-op decorator
+otherwise, so kernels stay importable (as plain Python) without the dependency.
+Callers that care about speed check ``HAS_NUMBA`` and pick a vectorized
+pandas/NumPy path instead of running a kernel interpreted.
+"""
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except Exception:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -1,5 +1,57 @@
+import threading
+
+import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter
 from trading_ig import IGService
+from urllib3.util.retry import Retry
+
+def _http_session() -> requests.Session:
+    """Keep-alive session for IG REST calls (data and orders).
+
+    A session serves one thread at a time: the login session and one per
+    worker thread (``WorkerSessions``). So one pooled connection to the IG
+    host is enough. Only connection setup failures are retried here; order
+    and price requests keep their own retry policy.
+    """
+    session = requests.Session()
+    session.headers["Connection"] = "keep-alive"
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=1,
+            max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.1),
+        ),
+    )
+    return session
+
+# Per-request headers IGService writes into whichever session it is given.
+_REQUEST_HEADERS = frozenset({"VERSION", "_method"})
+
+class WorkerSessions:
+    """One HTTP session per worker thread for IG REST calls.
+
+    IGService sets the ``VERSION`` header on the session of every request, so
+    threads sharing the login session race on it. Each thread gets its own
+    session instead, with the login's auth headers (API key, CST and security
+    tokens, account id) copied in before every call so a token change on the
+    login session reaches all workers. Pass ``get()`` as ``session=`` to the
+    IGService methods.
+    """
+
+    def __init__(self, ig: IGService):
+        self.ig = ig
+        self._local = threading.local()
+
+    def get(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = _http_session()
+        session.headers.update(
+            (k, v) for k, v in self.ig.session.headers.items() if k not in _REQUEST_HEADERS
+        )
+        return session
 
 class IGAuth:
     def __init__(self, api_key: str, username: str, password: str, account_type: str = "DEMO"):
@@ -11,7 +63,13 @@ class IGAuth:
 
     def login(self) -> IGService:
         logger.info(f"Logging in to IG ({self.account_type}) as {self.username}")
-        self.ig = IGService(username=self.username, password=self.password, api_key=self.api_key, acc_type=self.account_type)
+        self.ig = IGService(
+            username=self.username,
+            password=self.password,
+            api_key=self.api_key,
+            acc_type=self.account_type,
+            session=_http_session(),
+        )
         self.ig.create_session()
         logger.success("IG session created.")
         return self.ig
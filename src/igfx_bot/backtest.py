@@ -1,54 +1,109 @@
 import argparse
+import itertools
 import pandas as pd
 import yfinance as yf
 import backtrader as bt
+from joblib import Memory, Parallel, delayed
 from loguru import logger
 from .utils import load_config
 
+# Downloads are cached on disk so grid workers (separate processes) load the
+# same prices from the cache instead of each hitting yfinance.
+memory = Memory('.cache/backtest', verbose=0)
+
 class GenericStrategy(bt.Strategy):
     params = dict(name='sma_ema_crossover', fast=50, slow=200, rsi_len=14, rsi_ob=70, rsi_os=30)
 
     def __init__(self):
         self.dataclose = self.datas[0].close
+        # Resolve the per-bar logic once; next() runs for every bar.
         if self.p.name == 'sma_ema_crossover':
             self.sma = bt.ind.SMA(period=self.p.fast)
             self.ema = bt.ind.EMA(period=self.p.slow)
+            self._step = self._step_cross
         elif self.p.name == 'rsi_reversal':
             self.rsi = bt.ind.RSI(period=self.p.rsi_len)
+            self._step = self._step_rsi
+        else:
+            self._step = self._step_noop
 
     def next(self):
-        if self.p.name == 'sma_ema_crossover':
-            if not self.position and self.sma[0] > self.ema[0] and self.sma[-1] <= self.ema[-1]:
-                self.buy()
-            elif self.position and self.sma[0] < self.ema[0] and self.sma[-1] >= self.ema[-1]:
-                self.sell()
-        elif self.p.name == 'rsi_reversal':
-            if not self.position and self.rsi[0] < self.p.rsi_os:
-                self.buy()
-            elif self.position and self.rsi[0] > self.p.rsi_ob:
-                self.sell()
+        self._step()
+
+    def _step_cross(self):
+        if not self.position and self.sma[0] > self.ema[0] and self.sma[-1] <= self.ema[-1]:
+            self.buy()
+        elif self.position and self.sma[0] < self.ema[0] and self.sma[-1] >= self.ema[-1]:
+            self.sell()
+
+    def _step_rsi(self):
+        if not self.position and self.rsi[0] < self.p.rsi_os:
+            self.buy()
+        elif self.position and self.rsi[0] > self.p.rsi_ob:
+            self.sell()
+
+    def _step_noop(self):
+        pass
 
 def yf_symbol(symbol: str):
     mapping = {'EURUSD':'EURUSD=X', 'GBPUSD':'GBPUSD=X', 'USDJPY':'JPY=X'}
     return mapping.get(symbol, symbol)
 
-def run_backtest(args):
-    cfg = load_config(args.config)
+@memory.cache
+def download_prices(yfsym: str, start: str, end: str, interval: str) -> pd.DataFrame:
+    data = yf.download(yfsym, start=start, end=end, interval=interval)
+    return data.dropna()
+
+def _download_args(args):
+    return (yf_symbol(args.symbol), args.from_, args.to, '5m' if args.timeframe == '5min' else '1m')
+
+def _strategy_params(cfg):
+    params = cfg['strategy']['params']
+    return {k: params[k] for k in ('fast', 'slow', 'rsi_len', 'rsi_ob', 'rsi_os')}
+
+def run_single(download_args, strategy: str, params: dict) -> float:
+    """Run one Cerebro backtest and return the final portfolio value."""
     cerebro = bt.Cerebro()
     cerebro.broker.setcash(10000.0)
     cerebro.broker.setcommission(commission=0.0002)
+    cerebro.adddata(bt.feeds.PandasData(dataname=download_prices(*download_args)))
+    cerebro.addstrategy(GenericStrategy, name=strategy, **params)
+    cerebro.run()
+    return cerebro.broker.getvalue()
 
-    yfsym = yf_symbol(args.symbol)
-    data = yf.download(yfsym, start=args.from_, end=args.to, interval='5m' if args.timeframe=='5min' else '1m')
-    data.dropna(inplace=True)
-    datafeed = bt.feeds.PandasData(dataname=data)
-    cerebro.adddata(datafeed)
-    cerebro.addstrategy(GenericStrategy, name=args.strategy, fast=cfg['strategy']['params']['fast'], slow=cfg['strategy']['params']['slow'], rsi_len=cfg['strategy']['params']['rsi_len'], rsi_ob=cfg['strategy']['params']['rsi_ob'], rsi_os=cfg['strategy']['params']['rsi_os'])
-    res = cerebro.run()
-    final_val = cerebro.broker.getvalue()
+def run_backtest(args):
+    cfg = load_config(args.config)
+    final_val = run_single(_download_args(args), args.strategy, _strategy_params(cfg))
     logger.info(f"Final portfolio value: {final_val:.2f}")
     return final_val
 
+def parse_grid(specs):
+    """Expand ``['fast=20,50', 'slow=100,200']`` into a list of parameter dicts."""
+    axes = {}
+    for spec in specs:
+        key, _, values = spec.partition('=')
+        axes[key] = [float(v) if '.' in v else int(v) for v in values.split(',')]
+    return [dict(zip(axes, combo)) for combo in itertools.product(*axes.values())]
+
+def run_grid(args, grid, n_jobs: int = -1):
+    """Backtest every parameter set in ``grid`` in parallel processes.
+
+    Each entry overrides the config's strategy params. Returns
+    ``(params, final_value)`` pairs, best first.
+    """
+    cfg = load_config(args.config)
+    base = _strategy_params(cfg)
+    download_args = _download_args(args)
+    download_prices(*download_args)  # warm the cache once before fanning out
+    combos = [{**base, **overrides} for overrides in grid]
+    values = Parallel(n_jobs=n_jobs, prefer="processes")(
+        delayed(run_single)(download_args, args.strategy, params) for params in combos
+    )
+    results = sorted(zip(combos, values), key=lambda item: item[1], reverse=True)
+    for params, value in results:
+        logger.info(f"{params} -> final value {value:.2f}")
+    return results
+
 if __name__ == '__main__':
     p = argparse.ArgumentParser()
     p.add_argument('--config', required=True)
@@ -57,5 +112,11 @@ if __name__ == '__main__':
     p.add_argument('--timeframe', default='5min')
     p.add_argument('--from', dest='from_', required=True)
     p.add_argument('--to', required=True)
+    p.add_argument('--grid', nargs='+', metavar='PARAM=V1,V2',
+                   help='sweep strategy params, e.g. --grid fast=20,50 slow=100,200')
+    p.add_argument('--jobs', type=int, default=-1, help='worker processes for --grid (-1 = all cores)')
     args = p.parse_args()
-    run_backtest(args)
+    if args.grid:
+        run_grid(args, parse_grid(args.grid), n_jobs=args.jobs)
+    else:
+        run_backtest(args)
@@ -1,18 +1,48 @@
+import math
+import os
+import time
 import pandas as pd
 import numpy as np
 from loguru import logger
 from datetime import datetime, timedelta
-from .utils import Candle
+from .utils import Candle, log_throttled
+from . import indicators
 try:
     import talib
     HAS_TALIB = True
 except Exception:
     HAS_TALIB = False
-    import pandas_ta as ta
+
+def _bid_prices(prices: pd.DataFrame, columns) -> pd.DataFrame:
+    """Bid side of IG price columns as float64, in one normalize pass.
+
+    IG returns each price as ``{'bid': .., 'ask': .., 'lastTraded': ..}``; plain
+    numbers are accepted as well.
+    """
+    flat = pd.json_normalize(prices[columns].to_dict('records'))
+    flat.index = prices.index
+    out = {}
+    for col in columns:
+        bid = flat.get(f'{col}.bid')
+        plain = flat.get(col)
+        if bid is None:
+            values = plain
+        elif plain is None:
+            values = bid
+        else:
+            values = bid.fillna(plain)
+        out[col] = values.astype('float64')
+    return pd.DataFrame(out, index=prices.index)
 
 class MarketData:
-    def __init__(self, ig_service=None):
+    def __init__(self, ig_service=None, sessions=None):
         self.ig = ig_service
+        # Optional ``auth.WorkerSessions``, so concurrent fetches do not share
+        # the login session.
+        self.sessions = sessions
+
+    def _session(self):
+        return self.sessions.get() if self.sessions is not None else None
 
     def fetch_historical(self, epic: str, resolution: str = "MINUTE_5", n: int = 500) -> pd.DataFrame:
         """Fetch historical OHLC from IG. If IG unavailable, returns empty df."""
@@ -20,48 +50,130 @@ class MarketData:
             logger.warning("IG service not provided; returning empty DataFrame.")
             return pd.DataFrame()
         try:
-            resp = self.ig.fetch_historical_prices_by_epic_and_num_points(epic, resolution, n)
-            df = resp['prices']
-            # Normalize columns
-            df = df.rename(columns={
-                'snapshotTime': 'time',
-                'openPrice': 'openPrice',
-                'closePrice': 'closePrice',
-                'highPrice': 'highPrice',
-                'lowPrice': 'lowPrice',
-                'lastTradedVolume': 'lastTradedVolume',
-            })
-            # flatten dict columns
-            for col in ['openPrice','closePrice','highPrice','lowPrice']:
-                df[col] = df[col].apply(lambda d: float(d['bid']) if isinstance(d, dict) else float(d))
-            df = df.rename(columns={
-                'openPrice': 'open',
-                'closePrice': 'close',
-                'highPrice': 'high',
-                'lowPrice': 'low',
-                'lastTradedVolume': 'volume'
+            resp = self.ig.fetch_historical_prices_by_epic_and_num_points(
+                epic, resolution, n, session=self._session()
+            )
+            prices = pd.DataFrame(resp['prices'])
+            bids = _bid_prices(prices, ['openPrice', 'highPrice', 'lowPrice', 'closePrice'])
+            df = pd.DataFrame({
+                'time': pd.to_datetime(prices['snapshotTime']),
+                'open': bids['openPrice'],
+                'high': bids['highPrice'],
+                'low': bids['lowPrice'],
+                'close': bids['closePrice'],
+                'volume': prices['lastTradedVolume'],
             })
-            df['time'] = pd.to_datetime(df['time'])
-            df = df[['time','open','high','low','close','volume']].sort_values('time')
-            return df
+            return df.sort_values('time')
         except Exception as e:
-            logger.error(f"IG history error: {e}")
+            log_throttled(("ig_history", epic), "IG history error for {}: {}", epic, e, level="ERROR")
             return pd.DataFrame()
 
     def add_indicator(self, df: pd.DataFrame, name: str, **kwargs) -> pd.DataFrame:
         if df.empty:
             return df
-        close = df['close'].values.astype(float)
-        if name == 'sma':
-            length = kwargs.get('length', 50)
-            df[f'sma_{length}'] = pd.Series(close).rolling(length).mean().values
-        elif name == 'ema':
-            length = kwargs.get('length', 200)
-            df[f'ema_{length}'] = pd.Series(close).ewm(span=length, adjust=False).mean().values
-        elif name == 'rsi':
-            length = kwargs.get('length', 14)
-            if HAS_TALIB:
-                df[f'rsi_{length}'] = talib.RSI(close, timeperiod=length)
-            else:
-                df[f'rsi_{length}'] = ta.rsi(pd.Series(close), length=length).values
-        return df
+        add = _INDICATORS.get(name)
+        if add is None:
+            return df
+        return add(df, df['close'].values.astype(float), **kwargs)
+
+
+class CachedMarketData(MarketData):
+    """MarketData that keeps the last window per (epic, resolution) and fetches only new bars.
+
+    Each call still requests the most recent bars (at least two, so the
+    still-forming candle and the one just closed are always refreshed) and
+    merges them into the cached window by exact timestamp. A full fetch is
+    done on cold start or when the gap is as large as the window. With
+    ``cache_dir`` set, windows are also kept as Parquet files so a restart
+    starts warm.
+    """
+
+    BAR_SECONDS = {
+        'SECOND': 1, 'MINUTE': 60, 'MINUTE_2': 120, 'MINUTE_3': 180, 'MINUTE_5': 300,
+        'MINUTE_10': 600, 'MINUTE_15': 900, 'MINUTE_30': 1800, 'HOUR': 3600,
+        'HOUR_2': 7200, 'HOUR_3': 10800, 'HOUR_4': 14400, 'DAY': 86400,
+    }
+
+    def __init__(self, ig_service=None, cache_dir: str = None, sessions=None):
+        super().__init__(ig_service, sessions)
+        self.cache_dir = cache_dir
+        self._cache = {}
+        self._fetched_at = {}
+
+    def fetch_historical(self, epic: str, resolution: str = "MINUTE_5", n: int = 500) -> pd.DataFrame:
+        key = (epic, resolution)
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self._load_spill(key)
+        # Size the delta from wall-clock time since the last fetch; candle
+        # timestamps are in the account's timezone, not UTC.
+        if cached is None or len(cached) < n:
+            count = n
+        else:
+            elapsed = max(0.0, time.time() - self._fetched_at[key])
+            count = min(n, max(2, math.ceil(elapsed / self.BAR_SECONDS.get(resolution, 60)) + 2))
+
+        fresh = super().fetch_historical(epic, resolution=resolution, n=count)
+        if fresh.empty:
+            return fresh
+        if count < n:
+            df = pd.concat([cached, fresh], ignore_index=True)
+            df = df.drop_duplicates(subset='time', keep='last').sort_values('time')
+        else:
+            df = fresh
+        df = df.tail(n).reset_index(drop=True)
+
+        self._cache[key] = df
+        self._fetched_at[key] = time.time()
+        self._write_spill(key, df)
+        return df.copy()
+
+    def _spill_path(self, key) -> str:
+        epic, resolution = key
+        return os.path.join(self.cache_dir, f"{epic}_{resolution}.parquet")
+
+    def _load_spill(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._spill_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_parquet(path)
+            self._fetched_at[key] = os.path.getmtime(path)
+            return df
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable candle cache {path}: {e}")
+            return None
+
+    def _write_spill(self, key, df: pd.DataFrame):
+        if not self.cache_dir:
+            return
+        path = self._spill_path(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            df.to_parquet(f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+        except Exception as e:
+            logger.warning(f"Could not write candle cache {path}: {e}")
+
+
+def _add_sma(df: pd.DataFrame, close: np.ndarray, length: int = 50, **_) -> pd.DataFrame:
+    df[f'sma_{length}'] = indicators.sma(close, length)
+    return df
+
+
+def _add_ema(df: pd.DataFrame, close: np.ndarray, length: int = 200, **_) -> pd.DataFrame:
+    df[f'ema_{length}'] = indicators.ema(close, length)
+    return df
+
+
+def _add_rsi(df: pd.DataFrame, close: np.ndarray, length: int = 14, **_) -> pd.DataFrame:
+    if HAS_TALIB:
+        df[f'rsi_{length}'] = talib.RSI(close, timeperiod=length)
+    else:
+        df[f'rsi_{length}'] = indicators.rsi(close, length)
+    return df
+
+
+_INDICATORS = {'sma': _add_sma, 'ema': _add_ema, 'rsi': _add_rsi}
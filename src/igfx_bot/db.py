@@ -1,10 +1,16 @@
+import io
 import os
+import queue
+import threading
+import time
 from typing import Optional, Iterable
 from loguru import logger
 from dataclasses import dataclass
 import psycopg2
 import psycopg2.extras
 import pandas as pd
+from .trade_sql import pnl_sql
+from .utils import log_throttled
 
 @dataclass
 class PgConfig:
@@ -15,10 +21,126 @@ class PgConfig:
     password: Optional[str] = None
     dbname: Optional[str] = None
 
+# PnL is summed with the same per-trade expression the dashboard uses. The
+# aggregate is real-time (not materialized_only), so queries also see trades
+# newer than the last refresh; the dashboard builds its filters from it.
+TRADES_DAILY_SQL = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS trades_daily
+    WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+    SELECT
+        t.symbol,
+        t.side,
+        time_bucket(INTERVAL '1 day', t.ts) AS bucket,
+        count(*) AS trades,
+        sum({pnl}) AS pnl
+    FROM trades t
+    GROUP BY t.symbol, t.side, bucket
+    WITH NO DATA;
+""".format(pnl=pnl_sql("t", ",\n            "))
+
+SCHEMA_STATEMENTS = (
+    """
+    CREATE EXTENSION IF NOT EXISTS timescaledb;
+    CREATE TABLE IF NOT EXISTS candles (
+        symbol TEXT NOT NULL,
+        time   TIMESTAMPTZ NOT NULL,
+        open   DOUBLE PRECISION NOT NULL,
+        high   DOUBLE PRECISION NOT NULL,
+        low    DOUBLE PRECISION NOT NULL,
+        close  DOUBLE PRECISION NOT NULL,
+        volume DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY(symbol, time)
+    );
+    SELECT create_hypertable('candles','time', if_not_exists => TRUE);
+    CREATE INDEX IF NOT EXISTS idx_candles_symbol_time ON candles(symbol, time DESC);
+
+    CREATE TABLE IF NOT EXISTS trades (
+        id BIGSERIAL NOT NULL,
+        ts TIMESTAMPTZ NOT NULL DEFAULT now(),
+        epic TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        side TEXT NOT NULL,
+        size DOUBLE PRECISION NOT NULL,
+        entry DOUBLE PRECISION,
+        sl DOUBLE PRECISION,
+        tp DOUBLE PRECISION,
+        deal_ref TEXT,
+        raw JSONB,
+        PRIMARY KEY(id, ts)
+    );
+    """,
+    # Hypertables require the time column in every unique index, so tables
+    # created before trades became a hypertable get their key widened first.
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = 'trades'
+        ) THEN
+            ALTER TABLE trades DROP CONSTRAINT IF EXISTS trades_pkey;
+            ALTER TABLE trades ADD PRIMARY KEY (id, ts);
+            PERFORM create_hypertable('trades', 'ts', migrate_data => TRUE);
+        END IF;
+    END $$;
+    """,
+    # Native compression for chunks older than a week. Settings can only be
+    # changed while no chunk is compressed, hence the guard.
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM timescaledb_information.hypertables
+            WHERE hypertable_name = 'candles' AND compression_enabled
+        ) THEN
+            ALTER TABLE candles SET (
+                timescaledb.compress,
+                timescaledb.compress_segmentby = 'symbol',
+                timescaledb.compress_orderby = 'time DESC'
+            );
+        END IF;
+        IF NOT EXISTS (
+            SELECT 1 FROM timescaledb_information.hypertables
+            WHERE hypertable_name = 'trades' AND compression_enabled
+        ) THEN
+            ALTER TABLE trades SET (
+                timescaledb.compress,
+                timescaledb.compress_segmentby = 'symbol',
+                timescaledb.compress_orderby = 'ts DESC'
+            );
+        END IF;
+    END $$;
+    SELECT add_compression_policy('candles', INTERVAL '7 days', if_not_exists => TRUE);
+    SELECT add_compression_policy('trades', INTERVAL '7 days', if_not_exists => TRUE);
+    """,
+    # Daily per-symbol rollup so headline PnL does not need to scan trades.
+    TRADES_DAILY_SQL,
+    # The policy only refreshes the last 30 days; this one-off refresh
+    # materializes everything older, including trades migrated into the
+    # hypertable. Already-materialized ranges are skipped on later runs.
+    "CALL refresh_continuous_aggregate('trades_daily', NULL, NULL);",
+    """
+    SELECT add_continuous_aggregate_policy(
+        'trades_daily',
+        start_offset => INTERVAL '30 days',
+        end_offset => INTERVAL '1 hour',
+        schedule_interval => INTERVAL '1 hour',
+        if_not_exists => TRUE
+    );
+    """,
+)
+
+
+# Batches at least this large go through COPY; smaller (per-tick) writes use a
+# single INSERT, which needs fewer round trips.
+COPY_MIN_ROWS = 1000
+COPY_CHUNK_ROWS = 50_000
+
+
 class PgSink:
     def __init__(self, cfg: PgConfig):
         self.cfg = cfg
         self.conn = None
+        self._stage_ready = False
 
     def connect(self):
         if self.conn:
@@ -39,41 +161,23 @@ class PgSink:
     def init_schema(self):
         conn = self.connect()
         with conn.cursor() as cur:
-            cur.execute("""                CREATE EXTENSION IF NOT EXISTS timescaledb;
-            CREATE TABLE IF NOT EXISTS candles (
-                symbol TEXT NOT NULL,
-                time   TIMESTAMPTZ NOT NULL,
-                open   DOUBLE PRECISION NOT NULL,
-                high   DOUBLE PRECISION NOT NULL,
-                low    DOUBLE PRECISION NOT NULL,
-                close  DOUBLE PRECISION NOT NULL,
-                volume DOUBLE PRECISION NOT NULL,
-                PRIMARY KEY(symbol, time)
-            );
-            SELECT create_hypertable('candles','time', if_not_exists => TRUE);
-            CREATE INDEX IF NOT EXISTS idx_candles_symbol_time ON candles(symbol, time DESC);
-
-            CREATE TABLE IF NOT EXISTS trades (
-                id BIGSERIAL PRIMARY KEY,
-                ts TIMESTAMPTZ NOT NULL DEFAULT now(),
-                epic TEXT NOT NULL,
-                symbol TEXT NOT NULL,
-                side TEXT NOT NULL,
-                size DOUBLE PRECISION NOT NULL,
-                entry DOUBLE PRECISION,
-                sl DOUBLE PRECISION,
-                tp DOUBLE PRECISION,
-                deal_ref TEXT,
-                raw JSONB
-            );
-            """)
-            logger.info("TimescaleDB schema ensured (candles, trades)." )
+            # Executed one by one: continuous aggregates cannot be created
+            # inside the implicit transaction of a multi-statement query.
+            for statement in SCHEMA_STATEMENTS:
+                cur.execute(statement)
+            logger.info("TimescaleDB schema ensured (candles, trades, trades_daily)." )
 
     def write_candles(self, symbol: str, df: pd.DataFrame):
         if df is None or df.empty:
             return 0
+        if len(df) >= COPY_MIN_ROWS:
+            return self._copy_candles(symbol, df)
         conn = self.connect()
-        rows = list(zip([symbol]*len(df), df['time'], df['open'], df['high'], df['low'], df['close'], df['volume']))
+        # Lazily yield rows; execute_values only materializes one page at a time.
+        rows = (
+            (symbol, *row)
+            for row in df[['time', 'open', 'high', 'low', 'close', 'volume']].itertuples(index=False, name=None)
+        )
         with conn.cursor() as cur:
             psycopg2.extras.execute_values(
                 cur,
@@ -86,7 +190,57 @@ class PgSink:
                 rows,
                 page_size=1000
             )
-        return len(rows)
+        return len(df)
+
+    def _copy_candles(self, symbol: str, df: pd.DataFrame):
+        """Bulk upsert via COPY into a session-private staging table.
+
+        COPY skips per-row parameter binding; the upsert into `candles` then
+        runs as a single set-based statement. Rows are streamed in chunks so
+        the text buffer stays bounded for large backfills.
+        """
+        conn = self.connect()
+        # A batch may repeat a bar (e.g. a revised forming candle); the upsert
+        # can only touch each key once, so keep the latest copy.
+        frame = df[['time', 'open', 'high', 'low', 'close', 'volume']].drop_duplicates(
+            subset='time', keep='last'
+        )
+        with conn.cursor() as cur:
+            if not self._stage_ready:
+                cur.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS candles_stage (LIKE candles INCLUDING DEFAULTS)"
+                )
+                self._stage_ready = True
+            else:
+                # Cleared up front rather than in a `finally`, so rows left by a
+                # batch that failed part-way are dropped here and a cleanup
+                # error can never replace the error that failed it.
+                cur.execute("TRUNCATE candles_stage")
+            for start in range(0, len(frame), COPY_CHUNK_ROWS):
+                chunk = frame.iloc[start:start + COPY_CHUNK_ROWS]
+                buf = io.StringIO()
+                chunk.assign(symbol=symbol).to_csv(
+                    buf,
+                    sep='\t',
+                    header=False,
+                    index=False,
+                    na_rep='NaN',
+                    columns=['symbol', 'time', 'open', 'high', 'low', 'close', 'volume'],
+                )
+                buf.seek(0)
+                cur.copy_expert(
+                    "COPY candles_stage(symbol,time,open,high,low,close,volume) FROM STDIN",
+                    buf,
+                )
+            cur.execute(
+                """INSERT INTO candles(symbol,time,open,high,low,close,volume)
+                    SELECT symbol,time,open,high,low,close,volume FROM candles_stage
+                    ON CONFLICT (symbol, time) DO UPDATE
+                    SET open=EXCLUDED.open, high=EXCLUDED.high, low=EXCLUDED.low,
+                        close=EXCLUDED.close, volume=EXCLUDED.volume
+                """
+            )
+        return len(frame)
 
     def log_trade(self, *, epic:str, symbol:str, side:str, size:float, entry:float=None, sl:float=None, tp:float=None, deal_ref:str=None, raw:dict=None):
         conn = self.connect()
@@ -98,3 +252,66 @@ class PgSink:
             )
             rid = cur.fetchone()[0]
         return rid
+
+
+_STOP = object()
+
+
+class CandleWriter:
+    """Write candles to TimescaleDB from a background thread.
+
+    The trading loop only enqueues frames (``put``) and never waits on the
+    database. The worker drains the queue into per-symbol batches and flushes
+    them every ``flush_seconds`` (or once ``max_rows`` are pending) through
+    ``PgSink.write_candles``; rows repeating a bar keep the latest values.
+    Give it its own ``PgSink`` so it does not share a connection with the
+    trading path.
+    """
+
+    def __init__(self, sink: PgSink, *, flush_seconds: float = 30.0, max_rows: int = 5000):
+        self.sink = sink
+        self.flush_seconds = flush_seconds
+        self.max_rows = max_rows
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="candle-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, symbol: str, df: pd.DataFrame):
+        if df is not None and not df.empty:
+            self._queue.put((symbol, df))
+
+    def close(self, timeout: float = 10.0):
+        """Flush what is pending and stop the worker."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        pending = {}
+        rows = 0
+        deadline = time.monotonic() + self.flush_seconds
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is not None and item is not _STOP:
+                symbol, df = item
+                pending.setdefault(symbol, []).append(df)
+                rows += len(df)
+            if item is _STOP or rows >= self.max_rows or time.monotonic() >= deadline:
+                self._flush(pending)
+                pending, rows = {}, 0
+                deadline = time.monotonic() + self.flush_seconds
+            if item is _STOP:
+                return
+
+    def _flush(self, pending):
+        for symbol, frames in pending.items():
+            batch = pd.concat(frames, ignore_index=True).drop_duplicates(subset='time', keep='last')
+            try:
+                self.sink.write_candles(symbol, batch)
+            except Exception as exc:
+                log_throttled(
+                    ("write_candles", symbol), "write_candles failed for {} ({} rows): {}",
+                    symbol, len(batch), exc,
+                )
@@ -0,0 +1,490 @@
+"""Indicator kernels shared by the data layer and strategies.
+
+Each indicator has a ``_*_nb`` loop compiled with Numba (see ``_njit``) and a
+public wrapper that takes a float64 array. Without Numba the wrappers fall back
+to the equivalent pandas computation, so results match either way. The
+``Incremental*`` classes at the bottom compute the same values one bar at a
+time for live strategies.
+"""
+
+import operator
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from ._njit import HAS_NUMBA, njit
+
+
+@njit(cache=True)
+def _sma_nb(values, length):
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    total = 0.0
+    nans = 0
+    for i in range(n):
+        v = values[i]
+        if np.isnan(v):
+            nans += 1
+        else:
+            total += v
+        if i >= length:
+            old = values[i - length]
+            if np.isnan(old):
+                nans -= 1
+            else:
+                total -= old
+        if i >= length - 1 and nans == 0:
+            out[i] = total / length
+    return out
+
+
+@njit(cache=True)
+def _ema_step(weighted, old_wt, v, alpha, old_wt_factor):
+    # One step of ``Series.ewm(alpha=alpha, adjust=False).mean()``, including
+    # how pandas decays the previous value across NaN gaps. Start from
+    # ``weighted=nan, old_wt=1.0``; returns the updated ``(weighted, old_wt)``.
+    if np.isnan(weighted):
+        if not np.isnan(v):
+            return v, 1.0
+        return weighted, old_wt
+    old_wt *= old_wt_factor
+    if not np.isnan(v):
+        if weighted != v:
+            weighted = (old_wt * weighted + alpha * v) / (old_wt + alpha)
+        old_wt = 1.0
+    return weighted, old_wt
+
+
+@njit(cache=True)
+def _ema_inplace_nb(buf, alpha):
+    # EMA via ``_ema_step``. Each input is read before its slot is
+    # overwritten, so ``buf`` can be reused.
+    old_wt_factor = 1.0 - alpha
+    weighted = np.nan
+    old_wt = 1.0
+    for i in range(buf.shape[0]):
+        v = buf[i]
+        weighted, old_wt = _ema_step(weighted, old_wt, v, alpha, old_wt_factor)
+        buf[i] = weighted
+
+
+@njit(cache=True)
+def _ema_nb(values, alpha):
+    out = values.copy()
+    _ema_inplace_nb(out, alpha)
+    return out
+
+
+@njit(cache=True)
+def _ema_cascade_nb(values, alpha, passes):
+    out = values.copy()
+    for _ in range(passes):
+        _ema_inplace_nb(out, alpha)
+    return out
+
+
+@njit(cache=True)
+def _ema_tail_nb(values, alpha, passes, k):
+    # Last ``k`` values of ``passes`` chained EMAs. Earlier passes need the
+    # whole series and run in one scratch buffer; the final pass only keeps
+    # its tail.
+    n = values.shape[0]
+    k = min(k, n)
+    if passes > 1:
+        values = values.copy()
+        for _ in range(passes - 1):
+            _ema_inplace_nb(values, alpha)
+    out = np.empty(k)
+    old_wt_factor = 1.0 - alpha
+    weighted = np.nan
+    old_wt = 1.0
+    for i in range(n):
+        v = values[i]
+        weighted, old_wt = _ema_step(weighted, old_wt, v, alpha, old_wt_factor)
+        if i >= n - k:
+            out[i - (n - k)] = weighted
+    return out
+
+
+@njit(cache=True)
+def _sma_ema_tail_nb(values, fast, alpha):
+    # One pass for the SMA/EMA crossover: the EMA recurrence (``_ema_step``)
+    # plus the two trailing SMA window sums, returning
+    # (prev_sma, prev_ema, sma, ema) for the last two bars.
+    n = values.shape[0]
+    old_wt_factor = 1.0 - alpha
+    weighted = np.nan
+    old_wt = 1.0
+    prev_ema = np.nan
+    prev_sum = 0.0
+    cur_sum = 0.0
+    for i in range(n):
+        v = values[i]
+        weighted, old_wt = _ema_step(weighted, old_wt, v, alpha, old_wt_factor)
+        if i == n - 2:
+            prev_ema = weighted
+        if n - fast - 1 <= i < n - 1:
+            prev_sum += v
+        if i >= n - fast:
+            cur_sum += v
+    return prev_sum / fast, prev_ema, cur_sum / fast, weighted
+
+
+@njit(cache=True)
+def _rsi_nb(values, length):
+    # Wilder RSI seeded with the simple average of the first ``length``
+    # changes, as TA-Lib does.
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    if n <= length:
+        return out
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, length + 1):
+        change = values[i] - values[i - 1]
+        if change > 0:
+            avg_gain += change
+        else:
+            avg_loss -= change
+    avg_gain /= length
+    avg_loss /= length
+    total = avg_gain + avg_loss
+    out[length] = 100.0 * avg_gain / total if total != 0 else 0.0
+    for i in range(length + 1, n):
+        change = values[i] - values[i - 1]
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        avg_gain = (avg_gain * (length - 1) + gain) / length
+        avg_loss = (avg_loss * (length - 1) + loss) / length
+        total = avg_gain + avg_loss
+        out[i] = 100.0 * avg_gain / total if total != 0 else 0.0
+    return out
+
+
+@njit(cache=True)
+def _rsi_last_nb(values, length):
+    # Final value of ``_rsi_nb`` without materializing the output array.
+    n = values.shape[0]
+    if n <= length:
+        return np.nan
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, length + 1):
+        change = values[i] - values[i - 1]
+        if change > 0:
+            avg_gain += change
+        else:
+            avg_loss -= change
+    avg_gain /= length
+    avg_loss /= length
+    for i in range(length + 1, n):
+        change = values[i] - values[i - 1]
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        avg_gain = (avg_gain * (length - 1) + gain) / length
+        avg_loss = (avg_loss * (length - 1) + loss) / length
+    total = avg_gain + avg_loss
+    return 100.0 * avg_gain / total if total != 0 else 0.0
+
+
+@njit(cache=True)
+def _zigzag_nb(values, pct):
+    # Marks a pivot whenever price moves ``pct`` percent away from the last
+    # pivot, alternating direction; all other bars stay NaN.
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    if n < 3:
+        return out
+    last_pivot_price = values[0]
+    last_dir = 0
+    for i in range(1, n):
+        change = (values[i] - last_pivot_price) / last_pivot_price * 100.0
+        if last_dir >= 0 and change >= pct:
+            out[i] = values[i]
+            last_pivot_price = values[i]
+            last_dir = -1
+        elif last_dir <= 0 and change <= -pct:
+            out[i] = values[i]
+            last_pivot_price = values[i]
+            last_dir = 1
+    return out
+
+
+def sma(values: np.ndarray, length: int) -> np.ndarray:
+    """Simple moving average; NaN until ``length`` values are available."""
+    values = np.asarray(values, dtype=np.float64)
+    if HAS_NUMBA:
+        return _sma_nb(values, length)
+    return pd.Series(values).rolling(length).mean().to_numpy()
+
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average, ``alpha = 2 / (span + 1)``, seeded with the first value."""
+    values = np.asarray(values, dtype=np.float64)
+    if HAS_NUMBA:
+        return _ema_nb(values, 2.0 / (span + 1.0))
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def smoothed_ma(values: np.ndarray, length: int, smooth: int) -> np.ndarray:
+    """``smooth`` chained EMAs of span ``length`` (at least one), computed in one buffer."""
+    values = np.asarray(values, dtype=np.float64)
+    passes = max(1, smooth)
+    if HAS_NUMBA:
+        return _ema_cascade_nb(values, 2.0 / (length + 1.0), passes)
+    out = pd.Series(values)
+    for _ in range(passes):
+        out = out.ewm(span=length, adjust=False).mean()
+    return out.to_numpy()
+
+
+def ema_tail(values: np.ndarray, span: int, k: int = 2) -> np.ndarray:
+    """Last ``k`` values of ``ema(values, span)``."""
+    values = np.asarray(values, dtype=np.float64)
+    if HAS_NUMBA:
+        return _ema_tail_nb(values, 2.0 / (span + 1.0), 1, k)
+    return ema(values, span)[-k:]
+
+
+def sma_ema_tail(values: np.ndarray, fast: int, slow: int):
+    """``(prev_sma, prev_ema, sma, ema)``: the last two values of
+    ``sma(values, fast)`` and ``ema(values, slow)``, for crossover checks.
+
+    Needs at least ``fast + 2`` values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if HAS_NUMBA:
+        return _sma_ema_tail_nb(values, fast, 2.0 / (slow + 1.0))
+    prev_ema, ema_ = ema_tail(values, slow, 2)
+    return values[-fast-1:-1].mean(), prev_ema, values[-fast:].mean(), ema_
+
+
+def smoothed_ma_last(values: np.ndarray, length: int, smooth: int) -> float:
+    """Latest value of ``smoothed_ma(values, length, smooth)``."""
+    values = np.asarray(values, dtype=np.float64)
+    if not values.shape[0]:
+        return np.nan
+    if HAS_NUMBA:
+        return float(_ema_tail_nb(values, 2.0 / (length + 1.0), max(1, smooth), 1)[0])
+    return float(smoothed_ma(values, length, smooth)[-1])
+
+
+def _valid_run(values: np.ndarray):
+    """``(start, stop)`` of the values from the first non-NaN up to the next NaN."""
+    nan = np.isnan(values)
+    start = int(np.argmin(nan)) if not nan.all() else values.shape[0]
+    gaps = np.flatnonzero(nan[start:])
+    return start, start + int(gaps[0]) if gaps.size else values.shape[0]
+
+
+def rsi(values: np.ndarray, length: int) -> np.ndarray:
+    """Wilder RSI (TA-Lib compatible); NaN for the first ``length`` values.
+
+    Leading NaNs are skipped, as TA-Lib does. From the first NaN after them
+    on, the output is NaN (TA-Lib's own values there are not meaningful).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape[0], np.nan)
+    start, stop = _valid_run(values)
+    out[start:stop] = _rsi_run(values[start:stop], length)
+    return out
+
+
+def _rsi_run(values: np.ndarray, length: int) -> np.ndarray:
+    # RSI of a NaN-free run, by the kernel or its pandas equivalent.
+    if HAS_NUMBA:
+        return _rsi_nb(values, length)
+    out = np.full(values.shape[0], np.nan)
+    if values.shape[0] <= length:
+        return out
+    change = np.diff(values)
+    gains = np.clip(change, 0.0, None)
+    losses = np.clip(-change, 0.0, None)
+    # Wilder smoothing is an EMA with alpha = 1/length once seeded by the
+    # simple average of the first ``length`` changes.
+    avg_gain = pd.Series(np.r_[gains[:length].mean(), gains[length:]]).ewm(
+        alpha=1.0 / length, adjust=False
+    ).mean().to_numpy()
+    avg_loss = pd.Series(np.r_[losses[:length].mean(), losses[length:]]).ewm(
+        alpha=1.0 / length, adjust=False
+    ).mean().to_numpy()
+    total = avg_gain + avg_loss
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out[length:] = np.where(total != 0, 100.0 * avg_gain / total, 0.0)
+    return out
+
+
+def rsi_last(values: np.ndarray, length: int) -> float:
+    """Latest value of ``rsi(values, length)``."""
+    values = np.asarray(values, dtype=np.float64)
+    start, stop = _valid_run(values)
+    if stop < values.shape[0]:
+        return np.nan
+    if HAS_NUMBA:
+        return float(_rsi_last_nb(values[start:], length))
+    return float(rsi(values, length)[-1]) if values.shape[0] else np.nan
+
+
+def zigzag(values: np.ndarray, pct: float) -> np.ndarray:
+    """ZigZag pivot prices (NaN elsewhere) for a ``pct`` percent reversal threshold."""
+    # A single sequential pass; without Numba the kernel still runs on a raw
+    # float64 buffer rather than through pandas scalar indexing.
+    return _zigzag_nb(np.asarray(values, dtype=np.float64), float(pct))
+
+
+# ---------------------------------------------------------------------------
+# Incremental (O(1) per bar) counterparts, used by strategies that keep state
+# between scheduler ticks. ``update`` commits a closed bar; ``peek`` returns
+# the value the indicator would have if ``x`` were the next bar, without
+# changing state, which is how the still-forming candle is evaluated.
+# Values match the batch functions above bar for bar.
+# ---------------------------------------------------------------------------
+
+
+class IncrementalSMA:
+    """Running-sum simple moving average over the last ``length`` values."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self._window = deque(maxlen=length)
+        self._sum = 0.0
+        self._since_resum = 0
+
+    @property
+    def value(self) -> float:
+        if len(self._window) < self.length:
+            return np.nan
+        return self._sum / self.length
+
+    def peek(self, x: float) -> float:
+        if len(self._window) + 1 < self.length:
+            return np.nan
+        dropped = self._window[0] if len(self._window) == self.length else 0.0
+        return (self._sum - dropped + x) / self.length
+
+    def update(self, x: float) -> float:
+        if len(self._window) == self.length:
+            self._sum -= self._window[0]
+        self._window.append(x)
+        self._sum += x
+        self._since_resum += 1
+        # Re-add the window from scratch once per cycle so floating-point
+        # error from the add/subtract updates cannot accumulate.
+        if self._since_resum >= self.length:
+            self._sum = float(sum(self._window))
+            self._since_resum = 0
+        return self.value
+
+
+class IncrementalEMA:
+    """``ewm(span=span, adjust=False)`` EMA, seeded with the first value."""
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = np.nan
+
+    def peek(self, x: float) -> float:
+        if np.isnan(self.value):
+            return x
+        return self.value + self.alpha * (x - self.value)
+
+    def update(self, x: float) -> float:
+        self.value = self.peek(x)
+        return self.value
+
+
+class IncrementalEMACascade:
+    """``smooth`` chained EMAs of span ``length``, as in ``smoothed_ma``."""
+
+    def __init__(self, length: int, smooth: int):
+        self._stages = [IncrementalEMA(length) for _ in range(max(1, smooth))]
+
+    @property
+    def value(self) -> float:
+        return self._stages[-1].value
+
+    def peek(self, x: float) -> float:
+        for stage in self._stages:
+            x = stage.peek(x)
+        return x
+
+    def update(self, x: float) -> float:
+        for stage in self._stages:
+            x = stage.update(x)
+        return x
+
+
+class IncrementalWilderRSI:
+    """Wilder RSI with TA-Lib seeding; NaN until ``length`` changes are seen.
+
+    NaN handling follows ``rsi``: leading NaNs are skipped, and once a NaN
+    follows a value every later result is NaN.
+    """
+
+    def __init__(self, length: int):
+        self.length = length
+        self._prev = np.nan
+        self._changes = 0
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._gap = False
+        self.value = np.nan
+
+    def _advance(self, x: float):
+        if self._gap or np.isnan(x):
+            return self._changes, self._avg_gain, self._avg_loss, np.nan
+        if np.isnan(self._prev):
+            return 0, 0.0, 0.0, np.nan
+        change = x - self._prev
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        n = self.length
+        changes = self._changes + 1
+        if changes < n:
+            return changes, self._avg_gain + gain, self._avg_loss + loss, np.nan
+        if changes == n:
+            avg_gain = (self._avg_gain + gain) / n
+            avg_loss = (self._avg_loss + loss) / n
+        else:
+            avg_gain = (self._avg_gain * (n - 1) + gain) / n
+            avg_loss = (self._avg_loss * (n - 1) + loss) / n
+        total = avg_gain + avg_loss
+        return changes, avg_gain, avg_loss, (100.0 * avg_gain / total if total != 0 else 0.0)
+
+    def peek(self, x: float) -> float:
+        return self._advance(x)[3]
+
+    def update(self, x: float) -> float:
+        # Until seeded, the averages hold running sums of gains/losses.
+        self._changes, self._avg_gain, self._avg_loss, self.value = self._advance(x)
+        if np.isnan(x):
+            self._gap = self._gap or not np.isnan(self._prev)
+        else:
+            self._prev = x
+        return self.value
+
+
+class MonotonicDeque:
+    """Rolling max (or min) of the last ``window`` values in amortized O(1)."""
+
+    def __init__(self, window: int, mode: str = 'max'):
+        self.window = window
+        self._better = operator.ge if mode == 'max' else operator.le
+        self._items = deque()  # (position, value), values monotonic
+        self._count = 0
+
+    @property
+    def value(self) -> float:
+        if self._count < self.window:
+            return np.nan
+        return self._items[0][1]
+
+    def update(self, x: float) -> float:
+        while self._items and self._better(x, self._items[-1][1]):
+            self._items.pop()
+        self._items.append((self._count, x))
+        self._count += 1
+        if self._items[0][0] <= self._count - 1 - self.window:
+            self._items.popleft()
+        return self.value
@@ -7,6 +7,13 @@ from typing import Optional
 
 import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .utils import log_throttled
+
+# Seconds Telegram holds a getUpdates call open waiting for new messages.
+_LONG_POLL_SECONDS = 30
 
 
 class TelegramNotifier:
@@ -22,6 +29,21 @@ class TelegramNotifier:
         poll_interval: float = 2.0,
     ) -> None:
         self._session = requests.Session()
+        # One keep-alive connection to api.telegram.org is reused for every
+        # call; idempotent requests (getUpdates) are retried on throttling and
+        # transient server errors, honouring Retry-After.
+        self._session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=2,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                ),
+            ),
+        )
         self._base_url = f"https://api.telegram.org/bot{bot_token}"
         self._chat_id = chat_id
         self._require_confirmation = require_confirmation
@@ -54,38 +76,28 @@ class TelegramNotifier:
     ) -> bool:
         """Notify about a trade setup and optionally wait for confirmation."""
 
-        summary = (
-            "\n".join(
-                [
-                    "📈 Trade setup detected",
-                    f"Symbol: {symbol}",
-                    f"Direction: {direction}",
-                    f"Entry: {price_format.format(price)}",
-                    f"Stop Loss: {price_format.format(stop_loss)}",
-                    f"Take Profit: {price_format.format(take_profit)}",
-                    f"Size: {size}",
-                ]
-            )
-        )
+        entry_str, sl_str, tp_str = map(price_format.format, (price, stop_loss, take_profit))
+        lines = [
+            "📈 Trade setup detected",
+            f"Symbol: {symbol}",
+            f"Direction: {direction}",
+            f"Entry: {entry_str}",
+            f"Stop Loss: {sl_str}",
+            f"Take Profit: {tp_str}",
+            f"Size: {size}",
+            "",
+        ]
 
         if not self._require_confirmation:
-            self.send_message(
-                f"{summary}\n\nAuto-trading enabled – executing order without confirmation."
-            )
+            lines.append("Auto-trading enabled – executing order without confirmation.")
+            self.send_message("\n".join(lines))
             return True
 
-        self.send_message(
-            "\n".join(
-                [
-                    summary,
-                    "",
-                    (
-                        "Reply with 'yes {symbol}' to approve or 'no {symbol}' to cancel "
-                        "within the next {timeout}s."
-                    ).format(symbol=symbol.upper(), timeout=self._confirmation_timeout),
-                ]
-            )
+        lines.append(
+            f"Reply with 'yes {symbol.upper()}' to approve or 'no {symbol.upper()}' to cancel "
+            f"within the next {self._confirmation_timeout}s."
         )
+        self.send_message("\n".join(lines))
         return self._await_confirmation(expected_symbol=symbol)
 
     def notify_execution(
@@ -116,27 +128,38 @@ class TelegramNotifier:
         deadline = time.monotonic() + float(self._confirmation_timeout)
         symbol_token = expected_symbol.lower()
 
-        while time.monotonic() < deadline:
-            for approved in self._consume_updates(symbol_token):
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Long polling: Telegram answers as soon as a reply arrives, so the
+            # poll interval is only used to back off after a failed request.
+            decisions = self._consume_updates(
+                symbol_token, wait=max(1, int(min(remaining, _LONG_POLL_SECONDS)))
+            )
+            if decisions is None:
+                time.sleep(self._poll_interval)
+                continue
+            for approved in decisions:
                 return approved
-            time.sleep(self._poll_interval)
 
         self.send_message(f"⏳ Trade request for {expected_symbol} timed out.")
         return False
 
-    def _consume_updates(self, symbol_token: str):
+    def _consume_updates(self, symbol_token: str, *, wait: int = 0):
+        """Decisions found in new updates, or ``None`` if the request failed."""
         try:
-            params = {}
+            params = {"timeout": wait}
             if self._last_update_id is not None:
                 params["offset"] = self._last_update_id + 1
             resp = self._session.get(
-                f"{self._base_url}/getUpdates", params=params, timeout=10
+                f"{self._base_url}/getUpdates", params=params, timeout=wait + 10
             )
             resp.raise_for_status()
             payload = resp.json()
         except Exception as exc:  # pragma: no cover - network/Telegram failures
-            logger.warning(f"Telegram getUpdates failed: {exc}")
-            return []
+            log_throttled("telegram_get_updates", "Telegram getUpdates failed: {}", exc)
+            return None
 
         results = payload.get("result", []) if isinstance(payload, dict) else []
         decisions = []
@@ -1,8 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from loguru import logger
 import math
+import numpy as np
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RiskConfig:
     balance: float
     risk_per_trade_pct: float = 1.0
@@ -10,8 +11,16 @@ class RiskConfig:
     max_daily_loss_pct: float = 3.0
     max_daily_trades: int = 5
     slippage_pips: float = 0.5
+    # Account currency risked per trade; derived, fixed for the session.
+    risk_amount: float = field(init=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'risk_amount', self.balance * (self.risk_per_trade_pct / 100.0))
 
 class RiskManager:
+    # Mutable daily counters, so slots rather than a frozen dataclass.
+    __slots__ = ('cfg', '_daily_loss', '_daily_trades')
+
     def __init__(self, cfg: RiskConfig):
         self.cfg = cfg
         self._daily_loss = 0.0
@@ -27,7 +36,7 @@ class RiskManager:
         return True
 
     def position_size(self, entry: float, stop: float, pip_size: float, lot_size: int):
-        risk_amt = self.cfg.balance * (self.cfg.risk_per_trade_pct / 100.0)
+        risk_amt = self.cfg.risk_amount
         pip_risk = abs(entry - stop) / pip_size
         if pip_risk <= 0:
             return 0
@@ -36,6 +45,18 @@ class RiskManager:
         lots = max(1, int(units // lot_size))
         return lots * lot_size
 
+    def position_size_batch(self, entries, stops, pip_size: float, lot_size: int) -> np.ndarray:
+        """``position_size`` for arrays of entries/stops sharing one instrument, in one pass."""
+        entries = np.asarray(entries, dtype=np.float64)
+        stops = np.asarray(stops, dtype=np.float64)
+        risk_amt = self.cfg.risk_amount
+        pip_risk = np.abs(entries - stops) / pip_size
+        with np.errstate(divide='ignore', invalid='ignore'):
+            units = risk_amt / pip_risk / pip_size
+            lots = np.maximum(1.0, np.floor_divide(units, lot_size))
+        # Zero (or NaN) stop distance means no trade, as in the scalar version.
+        return np.where(pip_risk > 0, lots * lot_size, 0.0).astype(np.int64)
+
     def register_trade(self, pnl: float):
         self._daily_trades += 1
         if pnl < 0:
@@ -2,27 +2,42 @@
 
 from __future__ import annotations
 
+import asyncio
+import operator
 import signal
-import time
-from typing import Dict, Optional
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Sequence
 
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from loguru import logger
 
-from .auth import IGAuth
-from .data import MarketData
-from .db import PgConfig, PgSink
+from .auth import IGAuth, WorkerSessions
+from .data import CachedMarketData, MarketData
+from .db import CandleWriter, PgConfig, PgSink
 from .execution import Executor
 from .notifications import TelegramNotifier
 from .risk import RiskConfig, RiskManager
+from .strategy_base import Bars, Strategy
 from .strategies.alligator import Alligator
 from .strategies.fib_elliott import FibElliott
 from .strategies.rsi_reversal import RSIReversal
 from .strategies.sma_ema_crossover import SMAEMACrossover
-from .utils import env, load_config, now_utc, within_session
+from .utils import env, load_config, log_throttled, utc_hour, within_session
 
+__all__ = ["SUPPORTED_MODES", "InstrumentSpec", "build_strategy", "job", "main"]
 
-SUPPORTED_MODES = {"DEMO", "LIVE"}
+
+SUPPORTED_MODES = frozenset(map(sys.intern, ("DEMO", "LIVE")))
+
+
+# Exact spellings seen in configs and on the CLI map straight to a mode;
+# anything else goes through _normalise_mode.
+_MODE_TABLE = MappingProxyType(
+    {spelling: mode for mode in SUPPORTED_MODES for spelling in (mode, mode.lower(), mode.title())}
+)
 
 
 def _normalise_mode(mode: Optional[str]) -> Optional[str]:
@@ -33,55 +48,115 @@ def _normalise_mode(mode: Optional[str]) -> Optional[str]:
 
 
 def _resolve_mode(cli_mode: Optional[str], cfg_mode: Optional[str]) -> str:
-    for candidate in (_normalise_mode(cli_mode), _normalise_mode(cfg_mode)):
+    for raw in (cli_mode, cfg_mode):
+        if raw is None:
+            continue
+        mode = _MODE_TABLE.get(raw) if isinstance(raw, str) else None
+        if mode is not None:
+            return mode
+        candidate = _normalise_mode(raw)
         if candidate:
-            if candidate in SUPPORTED_MODES:
-                return candidate
+            mode = _MODE_TABLE.get(candidate)
+            if mode is not None:
+                return mode
             logger.warning("Unknown trading mode '{}'; falling back to DEMO", candidate)
     return "DEMO"
 
 
-def _resolve_ig_env_names(ig_cfg: dict, mode: str) -> Dict[str, Optional[str]]:
-    credentials_cfg = ig_cfg.get("credentials", {}) or {}
+class _FrozenMap(tuple):
+    """Hashable stand-in for a config dict: a tuple of ``(key, value)`` pairs.
 
-    mode_cfg: Dict[str, str] = {}
-    for key, value in credentials_cfg.items():
-        if isinstance(key, str) and key.strip().upper() == mode:
-            if isinstance(value, dict):
-                mode_cfg = value
-            break
+    Equality and hashing include the type, so a frozen dict never matches a
+    frozen list of pairs in the ``lru_cache`` below.
+    """
 
-    def _pick(name: str, fallback: Optional[str] = None) -> Optional[str]:
-        mode_key = f"{name}_env"
-        if mode_key in mode_cfg and mode_cfg[mode_key]:
-            return mode_cfg[mode_key]
-        value = ig_cfg.get(mode_key)
-        if value:
-            return value
-        return fallback
+    __slots__ = ()
 
-    return {
-        "api_key_env": _pick("api_key"),
-        "username_env": _pick("username"),
-        "password_env": _pick("password"),
-        "account_type_env": _pick("account_type"),
-        "account_id_env": _pick("account_id"),
-    }
+    def __eq__(self, other):
+        return type(other) is _FrozenMap and tuple.__eq__(self, other)
 
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((_FrozenMap, tuple(self)))
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return _FrozenMap((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
 
-def _read_env(name: Optional[str], default: Optional[str] = None) -> Optional[str]:
-    if not name:
-        return default
-    return env(name, default)
 
+def _thaw(value):
+    if isinstance(value, _FrozenMap):
+        return {k: _thaw(v) for k, v in value}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
 
-RUNNING = True
 
+_ENV_NAME_FIELDS = (
+    "api_key_env",
+    "username_env",
+    "password_env",
+    "account_type_env",
+    "account_id_env",
+)
+_ENV_NAME_DEFAULTS = dict.fromkeys(_ENV_NAME_FIELDS)
+_get_env_name_fields = operator.itemgetter(*_ENV_NAME_FIELDS)
 
-def handle_sig(sig, frame):
-    global RUNNING
-    logger.warning("Received shutdown signal; stopping scheduler...")
-    RUNNING = False
+
+def _resolve_ig_env_names(frozen_cfg: _FrozenMap, mode: str) -> Dict[str, Optional[str]]:
+    """Env-var names for ``mode``; ``frozen_cfg`` is the ``_freeze``-d ``ig`` section.
+
+    The section is frozen once where the config is loaded, so the cache key
+    is not rebuilt on every call. Callers get their own dict; the cached
+    table is never handed out.
+    """
+    table = _ig_env_name_table(frozen_cfg)
+    names = table.get(mode)
+    if names is None:
+        ig_cfg = _thaw(frozen_cfg)
+        names = _env_names_for_mode(ig_cfg, _credentials_by_mode(ig_cfg), mode)
+    return dict(zip(_ENV_NAME_FIELDS, names))
+
+
+@lru_cache(maxsize=8)
+def _ig_env_name_table(frozen_cfg: _FrozenMap) -> Mapping[str, tuple]:
+    """Env-var names for every supported mode, resolved once per config."""
+    ig_cfg = _thaw(frozen_cfg)
+    by_mode = _credentials_by_mode(ig_cfg)
+    return MappingProxyType(
+        {mode: _env_names_for_mode(ig_cfg, by_mode, mode) for mode in SUPPORTED_MODES}
+    )
+
+
+def _credentials_by_mode(ig_cfg: dict) -> Dict[str, object]:
+    # Normalise the section names once; the first spelling of a mode wins.
+    by_mode: Dict[str, object] = {}
+    for key, value in (ig_cfg.get("credentials", {}) or {}).items():
+        if isinstance(key, str):
+            by_mode.setdefault(key.strip().upper(), value)
+    return by_mode
+
+
+def _env_names_for_mode(ig_cfg: dict, by_mode: Dict[str, object], mode: str) -> tuple:
+    # A mode-specific value wins over the top-level one; empty counts as unset.
+    mode_cfg = by_mode.get(mode)
+    if not isinstance(mode_cfg, dict):
+        mode_cfg = {}
+    mode_values = _get_env_name_fields({**_ENV_NAME_DEFAULTS, **mode_cfg})
+    top_values = _get_env_name_fields({**_ENV_NAME_DEFAULTS, **ig_cfg})
+    return tuple(m or t or None for m, t in zip(mode_values, top_values))
+
+
+def _read_env(name: Optional[str], default: Optional[str] = None) -> Optional[str]:
+    if not name:
+        return default
+    return env(name, default)
 
 
 def build_strategy(name: str, params: dict):
@@ -113,6 +188,7 @@ def build_strategy(name: str, params: dict):
     raise ValueError(f"Unknown strategy {name}")
 
 
+@lru_cache(maxsize=64)
 def _price_format(pip_size: float) -> str:
     if pip_size <= 0:
         return "{:.5f}"
@@ -125,85 +201,162 @@ def _price_format(pip_size: float) -> str:
     return "{:." + str(precision) + "f}"
 
 
-def job(
+@dataclass(frozen=True, slots=True)
+class InstrumentSpec:
+    """Per-instrument settings resolved once from the config."""
+
+    symbol: str
+    epic: str
+    resolution: str
+    pip_size: float
+    lot_size: int
+    sl_distance: float
+    price_format: str
+
+    @classmethod
+    def from_config(cls, inst: dict) -> "InstrumentSpec":
+        pip_size = float(inst["pip_size"])
+        stop_distance_pips = max(inst.get("stop_distance_pips", 10), 1)
+        return cls(
+            symbol=inst["symbol"],
+            epic=inst["ig_epic"],
+            resolution="MINUTE_5" if inst.get("timeframe", "5min") == "5min" else "MINUTE",
+            pip_size=pip_size,
+            lot_size=int(inst["lot_size"]),
+            sl_distance=stop_distance_pips * pip_size,
+            price_format=_price_format(pip_size),
+        )
+
+
+async def job(
     cfg: dict,
     md: MarketData,
     ex: Executor,
     rm: RiskManager,
     sink: Optional[PgSink] = None,
     notifier: Optional[TelegramNotifier] = None,
-    strategies: Optional[Dict[str, object]] = None,
+    strategies: Optional[Mapping[str, Strategy]] = None,
+    candles: Optional[CandleWriter] = None,
+    instruments: Optional[Sequence[InstrumentSpec]] = None,
 ):
     scheduler_cfg = cfg.get("scheduler", {})
     session_cfg = scheduler_cfg.get("session", {})
     start_hour = session_cfg.get("start_hour", 0)
     end_hour = session_cfg.get("end_hour", 24)
 
-    if not within_session(now_utc(), start_hour, end_hour):
+    if not within_session(utc_hour(), start_hour, end_hour):
         return
 
-    strategy_cfg = cfg.get("strategy", {})
-    strategy_name = strategy_cfg.get("name")
-    strategy_params = strategy_cfg.get("params", {})
+    # Instruments are fetched and evaluated concurrently; the blocking IG,
+    # Telegram and database calls run in worker threads, and each worker
+    # thread talks to IG over its own session (``auth.WorkerSessions``).
+    # Anything that touches shared state is serialised through these locks:
+    # risk limits and orders, the Telegram chat, the DB connection.
+    trade_lock = asyncio.Lock()
+    chat_lock = asyncio.Lock()
+    sink_lock = asyncio.Lock()
+    if instruments is None:
+        instruments = [InstrumentSpec.from_config(inst) for inst in cfg.get("instruments", [])]
+    await asyncio.gather(
+        *(
+            _handle_instrument(
+                cfg, spec, md, ex, rm, sink, notifier, strategies, candles,
+                trade_lock, chat_lock, sink_lock,
+            )
+            for spec in instruments
+        )
+    )
+
+
+async def _handle_instrument(
+    cfg: dict,
+    spec: InstrumentSpec,
+    md: MarketData,
+    ex: Executor,
+    rm: RiskManager,
+    sink: Optional[PgSink],
+    notifier: Optional[TelegramNotifier],
+    strategies: Optional[Mapping[str, Strategy]],
+    candles: Optional[CandleWriter],
+    trade_lock: asyncio.Lock,
+    chat_lock: asyncio.Lock,
+    sink_lock: asyncio.Lock,
+):
     history_points = cfg.get("data", {}).get("history_points", 400)
 
-    for inst in cfg.get("instruments", []):
-        symbol = inst["symbol"]
-        epic = inst["ig_epic"]
-        resolution = "MINUTE_5" if inst.get("timeframe", "5min") == "5min" else "MINUTE"
-
-        strategy = None
-        if strategies is not None:
-            strategy = strategies.get(symbol)
-        if strategy is None:
-            if not strategy_name:
-                logger.warning("No strategy configured; skipping instrument {}", symbol)
-                continue
-            strategy = build_strategy(strategy_name, strategy_params)
-            if strategies is not None:
-                strategies[symbol] = strategy
-
-        df = md.fetch_historical(epic, resolution=resolution, n=history_points)
-        if sink and not df.empty:
-            try:
-                sink.write_candles(symbol, df.tail(1))
-            except Exception as exc:
-                logger.warning(f"write_candles failed for {symbol}: {exc}")
-
-        if df.empty:
-            continue
+    symbol = spec.symbol
+    epic = spec.epic
 
-        sig = strategy.generate(df)
-        if sig.side == "FLAT":
-            continue
+    # Strategies are built once in main() and keep indicator state between
+    # ticks; building one here would silently start from scratch.
+    strategy = strategies.get(symbol) if strategies is not None else None
+    if strategy is None:
+        logger.error("No strategy instance for instrument {}; skipping", symbol)
+        return
 
-        last = df.iloc[-1]
-        price = float(last["close"])
-        pip_size = float(inst["pip_size"])
-        lot_size = int(inst["lot_size"])
-        rr = rm.cfg.rr_ratio
-        stop_distance_pips = max(inst.get("stop_distance_pips", 10), 1)
-        sl_distance = stop_distance_pips * pip_size
+    try:
+        df = await asyncio.to_thread(
+            md.fetch_historical, epic, resolution=spec.resolution, n=history_points
+        )
+    except Exception as exc:
+        log_throttled(
+            ("fetch", symbol), "Data fetch failed for {}: {}", symbol, exc,
+            level="ERROR", exception=exc,
+        )
+        return
+    # The last two bars: the one that just closed (final values) and the
+    # forming one. Writes are batched off the trading path when a
+    # CandleWriter is configured.
+    if candles is not None and not df.empty:
+        candles.put(symbol, df.tail(2))
+    elif sink and not df.empty:
+        try:
+            async with sink_lock:
+                await asyncio.to_thread(sink.write_candles, symbol, df.tail(2))
+        except Exception as exc:
+            log_throttled(("write_candles", symbol), "write_candles failed for {}: {}", symbol, exc)
 
-        if sig.side == "BUY":
-            sl = price - sl_distance
-            tp = price + sl_distance * rr
-        else:
-            sl = price + sl_distance
-            tp = price - sl_distance * rr
+    if df.empty:
+        return
 
-        if not rm.can_trade():
-            continue
+    # Column arrays are extracted once per tick and shared with the strategy.
+    bars = Bars.from_frame(df)
+    sig = strategy.step(bars)
+    if sig.side == "FLAT":
+        return
 
-        size = rm.position_size(entry=price, stop=sl, pip_size=pip_size, lot_size=lot_size)
-        if size <= 0:
-            continue
+    price = float(bars.close[-1])
+    rr = rm.cfg.rr_ratio
+    sl_distance = spec.sl_distance
 
-        direction = "BUY" if sig.side == "BUY" else "SELL"
-        price_format = _price_format(pip_size)
+    if sig.side == "BUY":
+        sl = price - sl_distance
+        tp = price + sl_distance * rr
+    else:
+        sl = price + sl_distance
+        tp = price - sl_distance * rr
 
-        if notifier:
-            approved = notifier.handle_trade_alert(
+    # Risk checks run on the event loop without awaiting, so this early exit
+    # needs no lock; it spares the user a confirmation that could not be
+    # acted on.
+    if not rm.can_trade():
+        return
+
+    size = rm.position_size(
+        entry=price, stop=sl, pip_size=spec.pip_size, lot_size=spec.lot_size
+    )
+    if size <= 0:
+        return
+
+    direction = "BUY" if sig.side == "BUY" else "SELL"
+    price_format = spec.price_format
+
+    # The confirmation can wait for the whole Telegram timeout, so it only
+    # holds the chat; other instruments keep fetching and trading meanwhile.
+    if notifier:
+        async with chat_lock:
+            approved = await asyncio.to_thread(
+                notifier.handle_trade_alert,
                 symbol=symbol,
                 direction=direction,
                 price=price,
@@ -212,20 +365,30 @@ def job(
                 size=size,
                 price_format=price_format,
             )
-            if not approved:
-                continue
+        if not approved:
+            return
 
+    # Risk check, order and register_trade are one step, so concurrent
+    # instruments cannot both pass the daily caps.
+    async with trade_lock:
+        if not rm.can_trade():
+            return
         try:
-            resp = ex.place_market(epic=epic, direction=direction, size=size, sl=sl, tp=tp)
+            resp = await asyncio.to_thread(
+                ex.place_market, epic=epic, direction=direction, size=size, sl=sl, tp=tp
+            )
         except Exception as exc:
             logger.exception(f"Failed to execute trade for {symbol}: {exc}")
-            continue
+            return
+        rm.register_trade(0.0)
 
-        deal_ref = resp.get("dealReference") if isinstance(resp, dict) else None
+    deal_ref = resp.get("dealReference") if isinstance(resp, dict) else None
 
-        if sink:
-            try:
-                sink.log_trade(
+    if sink:
+        try:
+            async with sink_lock:
+                await asyncio.to_thread(
+                    sink.log_trade,
                     epic=epic,
                     symbol=symbol,
                     side=direction,
@@ -236,11 +399,13 @@ def job(
                     deal_ref=deal_ref,
                     raw=resp if isinstance(resp, dict) else None,
                 )
-            except Exception as exc:
-                logger.warning(f"log_trade failed for {symbol}: {exc}")
+        except Exception as exc:
+            log_throttled(("log_trade", symbol), "log_trade failed for {}: {}", symbol, exc)
 
-        if notifier:
-            notifier.notify_execution(
+    if notifier:
+        async with chat_lock:
+            await asyncio.to_thread(
+                notifier.notify_execution,
                 symbol=symbol,
                 direction=direction,
                 price=price,
@@ -249,8 +414,6 @@ def job(
                 price_format=price_format,
             )
 
-        rm.register_trade(0.0)
-
 
 def main(config_path: str, mode: Optional[str] = None):
     cfg = load_config(config_path)
@@ -258,8 +421,19 @@ def main(config_path: str, mode: Optional[str] = None):
     trading_mode = _resolve_mode(mode, cfg.get("mode"))
     logger.info("Selected IG trading mode: {}", trading_mode)
 
-    ig_cfg = cfg.get("ig", {})
-    env_names = _resolve_ig_env_names(ig_cfg, trading_mode)
+    # Instrument settings and one strategy instance per instrument are fixed
+    # for the lifetime of the process. Bad instrument entries and unknown or
+    # missing strategy names fail here, at startup, rather than every tick.
+    strategy_cfg = cfg.get("strategy", {})
+    strategy_name = strategy_cfg.get("name")
+    strategy_params = strategy_cfg.get("params", {})
+    instruments = tuple(InstrumentSpec.from_config(inst) for inst in cfg.get("instruments", []))
+    strategies: Mapping[str, Strategy] = MappingProxyType(
+        {spec.symbol: build_strategy(strategy_name, strategy_params) for spec in instruments}
+    )
+
+    frozen_ig_cfg = _freeze(cfg.get("ig", {}))
+    env_names = _resolve_ig_env_names(frozen_ig_cfg, trading_mode)
 
     api_key = _read_env(env_names.get("api_key_env"))
     username = _read_env(env_names.get("username_env"))
@@ -278,9 +452,13 @@ def main(config_path: str, mode: Optional[str] = None):
         except Exception as exc:
             logger.warning(f"Could not switch account: {exc}")
 
-    md = MarketData(ig_service=ig)
+    sessions = WorkerSessions(ig)
+    md = CachedMarketData(
+        ig_service=ig, cache_dir=cfg.get("data", {}).get("cache_dir"), sessions=sessions
+    )
 
     sink: Optional[PgSink] = None
+    candles: Optional[CandleWriter] = None
     db_cfg = cfg.get("database", {})
     if db_cfg.get("enabled"):
         dsn = env(db_cfg.get("dsn_env", "PG_DSN"))
@@ -302,8 +480,14 @@ def main(config_path: str, mode: Optional[str] = None):
             sink.init_schema()
         except Exception as exc:
             logger.warning(f"DB init failed: {exc}")
+        # Candle writes run on their own connection in a background thread.
+        candles = CandleWriter(
+            PgSink(pgcfg),
+            flush_seconds=float(db_cfg.get("candle_flush_seconds", 30)),
+            max_rows=int(db_cfg.get("candle_batch_rows", 5000)),
+        )
 
-    ex = Executor(ig_service=ig)
+    ex = Executor(ig_service=ig, sessions=sessions)
 
     risk_cfg = cfg.get("risk", {})
     rm = RiskManager(
@@ -336,38 +520,58 @@ def main(config_path: str, mode: Optional[str] = None):
         else:
             logger.warning("Telegram alerts enabled but bot token or chat id is missing.")
 
-    strategies: Dict[str, object] = {}
-    strategy_cfg = cfg.get("strategy", {})
-    strategy_name = strategy_cfg.get("name")
-    strategy_params = strategy_cfg.get("params", {})
-    if strategy_name:
-        for inst in cfg.get("instruments", []):
-            symbol = inst["symbol"]
-            strategies[symbol] = build_strategy(strategy_name, strategy_params)
-
     scheduler_cfg = cfg.get("scheduler", {})
-    scheduler = BackgroundScheduler()
+
+    try:
+        asyncio.run(
+            _serve(
+                scheduler_cfg.get("run_interval_seconds", 60),
+                [cfg, md, ex, rm, sink, notifier, strategies, candles, instruments],
+            )
+        )
+    finally:
+        if candles is not None:
+            candles.close()
+        auth.logout()
+        logger.info("Runner stopped.")
+
+
+def _install_stop_handlers(stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+
+    def request_stop(*_):
+        logger.warning("Received shutdown signal; stopping scheduler...")
+        loop.call_soon_threadsafe(stop.set)
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, request_stop)
+        except NotImplementedError:
+            # Windows event loops do not support add_signal_handler.
+            signal.signal(sig, request_stop)
+
+
+async def _serve(interval_seconds: float, job_args: list):
+    # AsyncIOScheduler binds to the running loop, so it is created here.
+    scheduler = AsyncIOScheduler()
     scheduler.add_job(
         job,
         "interval",
-        seconds=scheduler_cfg.get("run_interval_seconds", 60),
-        args=[cfg, md, ex, rm, sink, notifier, strategies],
+        seconds=interval_seconds,
+        args=job_args,
         max_instances=1,
         coalesce=True,
     )
     scheduler.start()
-
-    signal.signal(signal.SIGINT, handle_sig)
-    signal.signal(signal.SIGTERM, handle_sig)
     logger.info("IGFX-Bot runner started.")
 
+    # Sleep until SIGINT/SIGTERM instead of polling a flag.
+    stop = asyncio.Event()
+    _install_stop_handlers(stop)
     try:
-        while RUNNING:
-            time.sleep(1)
+        await stop.wait()
     finally:
         scheduler.shutdown(wait=False)
-        auth.logout()
-        logger.info("Runner stopped.")
 
 
 if __name__ == "__main__":
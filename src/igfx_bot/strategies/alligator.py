@@ -1,37 +1,75 @@
 import pandas as pd
-from ..strategy_base import Strategy, Signal
+from .. import indicators
+from ..indicators import IncrementalEMACascade, MonotonicDeque
+from ..strategy_base import Bars, BUY, FLAT, IncrementalStrategy, SELL, Signal
 
 def smoothed_ma(series: pd.Series, length: int, smooth: int) -> pd.Series:
-    ema = series.ewm(span=length, adjust=False).mean()
-    for _ in range(max(0, smooth-1)):
-        ema = ema.ewm(span=length, adjust=False).mean()
-    return ema
+    # Smoothed MA by repeated EMA
+    return pd.Series(indicators.smoothed_ma(series.to_numpy(), length, smooth), index=series.index)
 
-class Alligator(Strategy):
+_NEEDS_HIGH_LOW = "Alligator needs high and low prices; got close-only bars"
+
+class Alligator(IncrementalStrategy):
     """Standalone Alligator strategy.
     Entry when lips/teeth/jaw align (trend) and close breaks last N-bar high/low (momentum confirmation).
     """
+    __slots__ = ('jaw', 'teeth', 'lips', 'smooth', 'lookback', '_jaw', '_teeth', '_lips', '_lines', '_hi', '_lo')
+
     def __init__(self, jaw=13, teeth=8, lips=5, smooth=5, breakout_lookback=10):
         self.jaw = jaw; self.teeth = teeth; self.lips = lips; self.smooth = smooth
         self.lookback = breakout_lookback
+        super().__init__()
 
-    def generate(self, df: pd.DataFrame) -> Signal:
-        if len(df) < max(self.jaw, self.teeth, self.lips) + self.lookback + 2:
-            return Signal('FLAT')
-        d = df.copy()
-        d['jaw'] = smoothed_ma(d['close'], self.jaw, self.smooth)
-        d['teeth'] = smoothed_ma(d['close'], self.teeth, self.smooth)
-        d['lips'] = smoothed_ma(d['close'], self.lips, self.smooth)
+    def generate_bars(self, bars: Bars) -> Signal:
+        if bars.high is None or bars.low is None:
+            raise ValueError(_NEEDS_HIGH_LOW)
+        close = bars.close
+        if len(close) < max(self.jaw, self.teeth, self.lips) + self.lookback + 2:
+            return FLAT
+        jaw = indicators.smoothed_ma_last(close, self.jaw, self.smooth)
+        teeth = indicators.smoothed_ma_last(close, self.teeth, self.smooth)
+        lips = indicators.smoothed_ma_last(close, self.lips, self.smooth)
 
-        up = d['lips'].iloc[-1] > d['teeth'].iloc[-1] > d['jaw'].iloc[-1]
-        down = d['lips'].iloc[-1] < d['teeth'].iloc[-1] < d['jaw'].iloc[-1]
+        up = lips > teeth > jaw
+        down = lips < teeth < jaw
 
-        hi = d['high'].rolling(self.lookback).max().iloc[-2]  # prior bar
-        lo = d['low'].rolling(self.lookback).min().iloc[-2]
-        c = d['close'].iloc[-1]
+        # Breakout levels over the `lookback` bars before the current one.
+        hi = bars.high[-self.lookback-1:-1].max()
+        lo = bars.low[-self.lookback-1:-1].min()
+        c = close[-1]
+        return self._signal(up, down, c, hi, lo)
 
+    @staticmethod
+    def _signal(up, down, c, hi, lo) -> Signal:
         if up and c > hi:
-            return Signal('BUY')
+            return BUY
         if down and c < lo:
-            return Signal('SELL')
-        return Signal('FLAT')
+            return SELL
+        return FLAT
+
+    def _reset_state(self):
+        self._jaw = IncrementalEMACascade(self.jaw, self.smooth)
+        self._teeth = IncrementalEMACascade(self.teeth, self.smooth)
+        self._lips = IncrementalEMACascade(self.lips, self.smooth)
+        self._lines = (self._jaw, self._teeth, self._lips)
+        self._hi = MonotonicDeque(self.lookback, 'max')
+        self._lo = MonotonicDeque(self.lookback, 'min')
+
+    def _commit(self, bar):
+        if bar.high is None or bar.low is None:
+            raise ValueError(_NEEDS_HIGH_LOW)
+        close = bar.close
+        for line in self._lines:
+            line.update(close)
+        self._hi.update(bar.high)
+        self._lo.update(bar.low)
+
+    def _evaluate(self, bar) -> Signal:
+        if self._bars + 1 < max(self.jaw, self.teeth, self.lips) + self.lookback + 2:
+            return FLAT
+        close = bar.close
+        jaw, teeth, lips = [line.peek(close) for line in self._lines]
+        up = lips > teeth > jaw
+        down = lips < teeth < jaw
+        # The breakout levels come from committed bars only (prior bar).
+        return self._signal(up, down, close, self._hi.value, self._lo.value)
@@ -1,53 +1,53 @@
 import numpy as np
 import pandas as pd
-from ..strategy_base import Strategy, Signal
+from .. import indicators
+from ..strategy_base import Bars, BUY, FLAT, SELL, Signal, Strategy
 
 def zigzag_pivots(prices: pd.Series, pct=2.0):
-    pivots = [np.nan]*len(prices)
-    if len(prices) < 3: return pd.Series(pivots, index=prices.index)
-    last_pivot_price = prices.iloc[0]
-    last_dir = 0
-    for i in range(1, len(prices)):
-        change = (prices.iloc[i] - last_pivot_price) / last_pivot_price * 100.0
-        if last_dir >= 0 and change >= pct:
-            pivots[i] = prices.iloc[i]; last_pivot_price = prices.iloc[i]; last_dir = -1
-        elif last_dir <= 0 and change <= -pct:
-            pivots[i] = prices.iloc[i]; last_pivot_price = prices.iloc[i]; last_dir = 1
-    return pd.Series(pivots, index=prices.index)
+    return pd.Series(indicators.zigzag(prices.to_numpy(dtype=np.float64), pct), index=prices.index)
+
+def pivot_positions(close: np.ndarray, pct=2.0) -> np.ndarray:
+    """Integer positions of the ZigZag pivots in ``close``."""
+    return np.flatnonzero(~np.isnan(indicators.zigzag(close, pct)))
+
+def near_level(price: float, levels: np.ndarray, tol: float) -> bool:
+    """True if ``price`` is within a relative ``tol`` of any of ``levels``."""
+    return bool(np.any(np.abs(price - levels) / price <= tol))
 
 class FibElliott(Strategy):
     """Combined Fibonacci retracement + Elliott-like (ZigZag) swings.
     Long: in an upswing, enter near 38.2-61.8% retracement of the last swing.
     Short: symmetric for downswing.
     """
+    __slots__ = ('zigzag_pct', 'fib_levels', '_levels', 'tol')
+
     def __init__(self, zigzag_pct=2.0, fib_levels=(0.382,0.5,0.618), tolerance=0.0015):
         self.zigzag_pct = zigzag_pct
         self.fib_levels = fib_levels
+        self._levels = np.asarray(fib_levels, dtype=np.float64)
         self.tol = tolerance
 
-    def generate(self, df: pd.DataFrame) -> Signal:
-        if len(df) < 60:
-            return Signal('FLAT')
-        d = df.copy()
-        piv = zigzag_pivots(d['close'], pct=self.zigzag_pct).dropna()
+    def generate_bars(self, bars: Bars) -> Signal:
+        close = bars.close
+        if len(close) < 60:
+            return FLAT
+        piv = pivot_positions(close, pct=self.zigzag_pct)
         if len(piv) < 2:
-            return Signal('FLAT')
-        last = piv.index[-1]
-        prev = piv.index[-2]
-        swing_high = max(d['close'].iloc[prev:last+1])
-        swing_low = min(d['close'].iloc[prev:last+1])
-        price = d['close'].iloc[-1]
+            return FLAT
+        prev, last = piv[-2], piv[-1]
+        swing = close[prev:last+1]
+        swing_high = swing.max()
+        swing_low = swing.min()
+        price = close[-1]
         if swing_high <= swing_low:
-            return Signal('FLAT')
+            return FLAT
         # Determine direction by last move
-        up_move = d['close'].iloc[last] > d['close'].iloc[prev]
+        up_move = close[last] > close[prev]
         diff = swing_high - swing_low
         if up_move:
-            retr_levels = [swing_high - lvl*diff for lvl in self.fib_levels]
-            if any(abs(price - rl)/price <= self.tol for rl in retr_levels):
-                return Signal('BUY')
+            if near_level(price, swing_high - self._levels*diff, self.tol):
+                return BUY
         else:
-            retr_levels = [swing_low + lvl*diff for lvl in self.fib_levels]
-            if any(abs(price - rl)/price <= self.tol for rl in retr_levels):
-                return Signal('SELL')
-        return Signal('FLAT')
+            if near_level(price, swing_low + self._levels*diff, self.tol):
+                return SELL
+        return FLAT
@@ -1,29 +1,36 @@
-import pandas as pd
-from ..strategy_base import Strategy, Signal
-try:
-    import talib
-    HAS_TALIB = True
-except Exception:
-    HAS_TALIB = False
-    import pandas_ta as ta
+from .. import indicators
+from ..indicators import IncrementalWilderRSI
+from ..strategy_base import Bars, BUY, FLAT, IncrementalStrategy, SELL, Signal
+
+class RSIReversal(IncrementalStrategy):
+    __slots__ = ('length', 'ob', 'os', '_rsi')
 
-class RSIReversal(Strategy):
     def __init__(self, length=14, ob=70, os=30):
         self.length = length
         self.ob = ob
         self.os = os
+        super().__init__()
+
+    def generate_bars(self, bars: Bars) -> Signal:
+        if len(bars.close) < self.length + 2:
+            return FLAT
+        # Same Wilder/SMA-seeded RSI as TA-Lib; only the last value is needed.
+        return self._signal(indicators.rsi_last(bars.close, self.length))
 
-    def generate(self, df: pd.DataFrame) -> Signal:
-        if len(df) < self.length + 2:
-            return Signal('FLAT')
-        close = df['close'].values
-        if HAS_TALIB:
-            rsi = talib.RSI(close, timeperiod=self.length)
-        else:
-            rsi = ta.rsi(df['close'], length=self.length).values
-        val = rsi[-1]
+    def _signal(self, val) -> Signal:
         if val < self.os:
-            return Signal('BUY')
+            return BUY
         if val > self.ob:
-            return Signal('SELL')
-        return Signal('FLAT')
+            return SELL
+        return FLAT
+
+    def _reset_state(self):
+        self._rsi = IncrementalWilderRSI(self.length)
+
+    def _commit(self, bar):
+        self._rsi.update(bar.close)
+
+    def _evaluate(self, bar) -> Signal:
+        if self._bars + 1 < self.length + 2:
+            return FLAT
+        return self._signal(self._rsi.peek(bar.close))
@@ -1,23 +1,64 @@
-import pandas as pd
-from ..strategy_base import Strategy, Signal
+import numpy as np
+from .. import indicators
+from ..indicators import IncrementalEMA, IncrementalSMA
+from ..strategy_base import Bars, BUY, FLAT, IncrementalStrategy, SELL, Signal, as_bars
+
+class SMAEMACrossover(IncrementalStrategy):
+    __slots__ = ('fast', 'slow', '_sma', '_ema')
 
-class SMAEMACrossover(Strategy):
     def __init__(self, fast=50, slow=200):
         self.fast = fast
         self.slow = slow
+        super().__init__()
+
+    def generate_bars(self, bars: Bars) -> Signal:
+        close = bars.close
+        if len(close) < max(self.fast, self.slow) + 2:
+            return FLAT
+        # Only the last two bars are compared; SMA and EMA come from one pass.
+        prev_sma, prev_ema, sma, ema = indicators.sma_ema_tail(close, self.fast, self.slow)
+        return self._cross(prev_sma, prev_ema, sma, ema)
+
+    def generate_series(self, data) -> np.ndarray:
+        """Per-bar signals as int8 (+1 BUY, -1 SELL, 0 FLAT), for backtests.
+
+        Element ``i`` is what ``generate`` returns for the first ``i + 1`` bars.
+        """
+        close = as_bars(data).close
+        sma = indicators.sma(close, self.fast)
+        ema = indicators.ema(close, self.slow)
+        prev_sma, prev_ema = sma[:-1], ema[:-1]
+        cur_sma, cur_ema = sma[1:], ema[1:]
+        out = np.zeros(len(close), dtype=np.int8)
+        out[1:] = (
+            ((prev_sma < prev_ema) & (cur_sma > cur_ema)).astype(np.int8)
+            - ((prev_sma > prev_ema) & (cur_sma < cur_ema)).astype(np.int8)
+        )
+        out[:max(self.fast, self.slow) + 1] = 0
+        return out
 
-    def generate(self, df: pd.DataFrame) -> Signal:
-        if len(df) < max(self.fast, self.slow) + 2:
-            return Signal('FLAT')
-        df = df.copy()
-        df['sma'] = df['close'].rolling(self.fast).mean()
-        df['ema'] = df['close'].ewm(span=self.slow, adjust=False).mean()
-        c1, p1 = df.iloc[-1], df.iloc[-2]
+    @staticmethod
+    def _cross(prev_sma, prev_ema, sma, ema) -> Signal:
         # Crossovers
-        buy = p1['sma'] < p1['ema'] and c1['sma'] > c1['ema']
-        sell = p1['sma'] > p1['ema'] and c1['sma'] < c1['ema']
+        buy = prev_sma < prev_ema and sma > ema
+        sell = prev_sma > prev_ema and sma < ema
         if buy:
-            return Signal('BUY')
+            return BUY
         if sell:
-            return Signal('SELL')
-        return Signal('FLAT')
+            return SELL
+        return FLAT
+
+    def _reset_state(self):
+        self._sma = IncrementalSMA(self.fast)
+        self._ema = IncrementalEMA(self.slow)
+
+    def _commit(self, bar):
+        close = bar.close
+        self._sma.update(close)
+        self._ema.update(close)
+
+    def _evaluate(self, bar) -> Signal:
+        if self._bars + 1 < max(self.fast, self.slow) + 2:
+            return FLAT
+        close, sma, ema = bar.close, self._sma, self._ema
+        return self._cross(sma.value, ema.value, sma.peek(close), ema.peek(close))
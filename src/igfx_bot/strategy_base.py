@@ -1,15 +1,193 @@
+import copy
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+from itertools import repeat
+from typing import NamedTuple, Optional, Union
+import numpy as np
 import pandas as pd
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Signal:
     side: str   # 'BUY' or 'SELL' or 'FLAT'
     sl: float = None
     tp: float = None
     size: float = 0.0
 
+# Signals are immutable, so strategies return these shared instances.
+FLAT = Signal('FLAT')
+BUY = Signal('BUY')
+SELL = Signal('SELL')
+
+class Bar(NamedTuple):
+    time: object
+    open: Optional[float]
+    high: Optional[float]
+    low: Optional[float]
+    close: Optional[float]
+    volume: Optional[float]
+
+class Bars(NamedTuple):
+    """Column arrays of a candle window, extracted once and shared by strategies.
+
+    Prices are contiguous float64 buffers (a frame built from a 2-D array
+    would otherwise hand out strided column views); a column missing from
+    the frame is ``None``.
+    """
+    time: Optional[np.ndarray]
+    open: Optional[np.ndarray]
+    high: Optional[np.ndarray]
+    low: Optional[np.ndarray]
+    close: Optional[np.ndarray]
+    volume: Optional[np.ndarray]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'Bars':
+        def col(name):
+            return np.ascontiguousarray(df[name].to_numpy(dtype=np.float64)) if name in df else None
+        time = df['time'].to_numpy() if 'time' in df else None
+        return cls(time, col('open'), col('high'), col('low'), col('close'), col('volume'))
+
+    @classmethod
+    def from_close(cls, close) -> 'Bars':
+        """Close-only window, for strategies that need nothing else."""
+        return cls(None, None, None, None, np.ascontiguousarray(close, dtype=np.float64), None)
+
+    @property
+    def size(self) -> int:
+        return next((len(a) for a in self if a is not None), 0)
+
+    def rows(self, start=0, stop=None):
+        """``Bar`` tuples for positions ``start:stop``, with Python float prices."""
+        # Times stay array elements so they compare equal to ``self.time``.
+        time = repeat(None) if self.time is None else self.time[start:stop]
+        prices = (repeat(None) if a is None else a[start:stop].tolist() for a in self[1:])
+        return map(Bar._make, zip(time, *prices))
+
+def as_bars(data: Union[pd.DataFrame, Bars, np.ndarray]) -> Bars:
+    """``Bars`` for a frame, an existing ``Bars``, or a 1-D array of closes.
+
+    An array gives close-only bars, which are enough for strategies that read
+    nothing but ``close``; the others raise ``ValueError`` on them.
+    """
+    if isinstance(data, Bars):
+        return data
+    if isinstance(data, np.ndarray):
+        return Bars.from_close(data)
+    return Bars.from_frame(data)
+
 class Strategy(ABC):
+    # Subclasses list their attributes in ``__slots__`` as well.
+    __slots__ = ()
+
+    def generate(self, data: Union[pd.DataFrame, np.ndarray]) -> Signal:
+        """Signal for the last row of ``data``: a candle frame, or (for close-only
+        strategies) a 1-D array of closes."""
+        return self.generate_bars(as_bars(data))
+
     @abstractmethod
-    def generate(self, df: pd.DataFrame) -> Signal:
+    def generate_bars(self, bars: Bars) -> Signal:
         ...
+
+    def step(self, data: Union[pd.DataFrame, Bars]) -> Signal:
+        """Signal for the latest candle window; stateless strategies just ``generate``."""
+        return self.generate_bars(as_bars(data))
+
+class IncrementalStrategy(Strategy):
+    """Strategy that carries its indicator state across calls.
+
+    Closed bars are committed to the indicators once (``_commit``); the newest
+    bar is treated as still forming and only evaluated against that state
+    (``_evaluate``), so a candle that keeps updating within its interval is
+    never double counted. ``generate`` stays the stateless batch version and
+    gives the same signals.
+    """
+    __slots__ = ('_pending', '_pending_time', '_bars')
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._pending = None
+        self._pending_time = None
+        self._bars = 0
+        self._reset_state()
+
+    @abstractmethod
+    def _reset_state(self):
+        ...
+
+    @abstractmethod
+    def _commit(self, bar):
+        ...
+
+    @abstractmethod
+    def _evaluate(self, bar) -> Signal:
+        ...
+
+    def update(self, bar) -> Signal:
+        """Feed the newest bar (a row with ``time`` and price fields) and return its signal."""
+        if self._pending is not None and bar.time != self._pending_time:
+            self._commit(self._pending)
+            self._bars += 1
+        self._pending, self._pending_time = bar, bar.time
+        return self._evaluate(bar)
+
+    def warmup(self, data) -> 'IncrementalStrategy':
+        """Commit every bar of ``data`` as closed and return a snapshot of the state.
+
+        With ``update_from`` this lets a backtest or grid search pay for a
+        shared history once and evaluate many continuations from it.
+        """
+        self._reset()
+        for bar in as_bars(data).rows():
+            self._commit(bar)
+            self._bars += 1
+        return copy.deepcopy(self)
+
+    def update_from(self, state: 'IncrementalStrategy', tail):
+        """Resume from a ``warmup`` snapshot, feed ``tail`` and return ``(new_state, signal)``.
+
+        The signal is the one ``generate`` gives for the warm-up history
+        followed by ``tail``. ``state`` is left untouched; ``new_state`` has
+        every bar of ``tail`` committed.
+        """
+        strategy = copy.deepcopy(state)
+        bars = as_bars(tail)
+        if not bars.size:
+            raise ValueError("update_from() needs at least one bar")
+        for bar in bars.rows(0, -1):
+            strategy._commit(bar)
+            strategy._bars += 1
+        last = next(bars.rows(-1))
+        signal = strategy._evaluate(last)
+        strategy._commit(last)
+        strategy._bars += 1
+        return strategy, signal
+
+    def step(self, data: Union[pd.DataFrame, Bars]) -> Signal:
+        """Catch up on ``data`` and return the signal for its last row.
+
+        Only bars after the last one seen are processed. When that bar is no
+        longer in the window (first call, gap, or out-of-order data) the state
+        is rebuilt from the whole window.
+        """
+        bars = as_bars(data)
+        if not bars.size:
+            return FLAT
+        if bars.time is None:
+            raise ValueError("step() needs a 'time' column")
+        start = None
+        if self._pending is not None:
+            matches = np.flatnonzero(bars.time == self._pending_time)
+            if len(matches):
+                start = int(matches[-1])
+        if start is None:
+            self._reset()
+            start = 0
+        # Commit from the final version of the previously pending bar on.
+        self._pending = None
+        commit = self._commit
+        for bar in bars.rows(start, -1):
+            commit(bar)
+        self._bars += max(0, bars.size - 1 - start)
+        return self.update(next(bars.rows(-1)))
@@ -0,0 +1,57 @@
+"""SQL fragments for reading fields out of ``trades.raw``.
+
+Shared by the schema (the ``trades_daily`` continuous aggregate) and the
+dashboard queries, so per-trade and rolled-up PnL are computed the same way.
+Kept free of third-party imports so the dashboard can load it on its own.
+"""
+
+# JSON paths inside `trades.raw` that may carry realized PnL / exit time. IG
+# payloads are not consistent, so every known shape is tried in order.
+PNL_JSON_PATHS = (
+    "profitAndLoss",
+    "profitAndLoss,value",
+    "profitAndLossAmount",
+    "profitAndLossAmount,value",
+    "pnl",
+    "pnl,value",
+    "PnL",
+    "PnL,value",
+)
+EXIT_TS_JSON_PATHS = ("closeTime", "closedTime", "exitTime")
+
+NUMERIC_RE = r"^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$"
+TIMESTAMP_RE = (
+    r"^\d{4}[-/]\d{2}[-/]\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?\s*(Z|[+-]\d{2}(:?\d{2})?)?$"
+)
+
+
+def json_text_sql(path: str, alias: str = "t") -> str:
+    """SQL expression reading ``raw #>> path`` as text, with no cast that could fail."""
+
+    return f"({alias}.raw #>> '{{{path}}}')"
+
+
+def json_float_sql(path: str, alias: str = "t") -> str:
+    """SQL expression reading ``raw #>> path`` as float8, or NULL if not numeric."""
+
+    value = json_text_sql(path, alias)
+    return f"CASE WHEN {value} ~ '{NUMERIC_RE}' THEN {value}::float8 END"
+
+
+def json_timestamptz_sql(path: str, alias: str = "t") -> str:
+    """SQL expression reading ``raw #>> path`` as timestamptz, or NULL if unparseable."""
+
+    value = json_text_sql(path, alias)
+    return f"CASE WHEN {value} ~ '{TIMESTAMP_RE}' THEN {value}::timestamptz END"
+
+
+def pnl_sql(alias: str = "t", sep: str = ", ") -> str:
+    """Realized PnL of a trade row: the first numeric value among ``PNL_JSON_PATHS``."""
+
+    return "COALESCE(" + sep.join(json_float_sql(path, alias) for path in PNL_JSON_PATHS) + ")"
+
+
+def exit_ts_sql(alias: str = "t", sep: str = ", ") -> str:
+    """Exit time of a trade row: the first parseable value among ``EXIT_TS_JSON_PATHS``."""
+
+    return "COALESCE(" + sep.join(json_timestamptz_sql(path, alias) for path in EXIT_TS_JSON_PATHS) + ")"
@@ -1,12 +1,11 @@
 import os
 import time
 import math
-import pytz
 import yaml
 from dataclasses import dataclass
 from dataclasses_json import dataclass_json
 from loguru import logger
-from datetime import datetime
+from datetime import datetime, timezone
 from tzlocal import get_localzone
 
 @dataclass_json
@@ -25,14 +24,19 @@ def load_config(path: str) -> dict:
     return cfg
 
 def within_session(now_utc, start_hour, end_hour):
-    hour = now_utc.hour
+    """``now_utc`` may be a datetime or an hour of day (0-23)."""
+    hour = now_utc if isinstance(now_utc, int) else now_utc.hour
     if start_hour <= end_hour:
         return start_hour <= hour < end_hour
     else:
         return hour >= start_hour or hour < end_hour
 
 def now_utc():
-    return datetime.utcnow().replace(tzinfo=pytz.UTC)
+    return datetime.now(timezone.utc)
+
+def utc_hour() -> int:
+    """Current UTC hour, without building a datetime."""
+    return time.gmtime().tm_hour
 
 def env(name: str, default: str = None):
     v = os.environ.get(name, default)
@@ -40,5 +44,21 @@ def env(name: str, default: str = None):
         logger.warning(f"Environment variable {name} not set.")
     return v
 
+_last_logged = {}
+
+def log_throttled(key, message: str, *args, level: str = "WARNING", interval: float = 60.0, exception=None):
+    """Log ``message`` at most once per ``interval`` seconds for ``key``.
+
+    Uses loguru's ``{}`` placeholders, so suppressed calls format nothing.
+    Returns True when the message was emitted.
+    """
+    now = time.monotonic()
+    last = _last_logged.get(key)
+    if last is not None and now - last < interval:
+        return False
+    _last_logged[key] = now
+    logger.opt(depth=1, exception=exception).log(level, message, *args)
+    return True
+
 def round_to_pip(price: float, pip_size: float):
     return round(price / pip_size) * pip_size
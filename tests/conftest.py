@@ -1,8 +1,26 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 
 ROOT = Path(__file__).resolve().parents[1]
 ROOT_STR = str(ROOT)
 if ROOT_STR not in sys.path:
     sys.path.insert(0, ROOT_STR)
+
+
+# Heavy imports happen when a fixture is first requested, not at collection.
+
+@pytest.fixture(scope="session")
+def close_df():
+    import numpy as np
+    import pandas as pd
+    return pd.DataFrame({"close": np.arange(1, 300, dtype=np.float64)})
+
+
+@pytest.fixture(scope="session")
+def sma_ema_strategy():
+    from src.igfx_bot.strategies.sma_ema_crossover import SMAEMACrossover
+    # Shared across tests: only use the stateless ``generate`` path with it.
+    return SMAEMACrossover(fast=5, slow=10)
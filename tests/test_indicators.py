@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.igfx_bot import indicators
+
+
+def _close(n=500, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.001, n))
+    close[[40, 41, 200]] = np.nan
+    return close
+
+
+def test_sma_matches_pandas_rolling():
+    close = _close()
+    expected = pd.Series(close).rolling(20).mean().to_numpy()
+    np.testing.assert_allclose(indicators.sma(close, 20), expected, equal_nan=True)
+
+
+def test_ema_matches_pandas_ewm():
+    close = _close()
+    expected = pd.Series(close).ewm(span=50, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(indicators.ema(close, 50), expected, equal_nan=True)
+
+
+def test_rsi_matches_talib():
+    talib = pytest.importorskip("talib")
+    close = _close()[250:]
+    np.testing.assert_allclose(indicators.rsi(close, 14), talib.RSI(close, timeperiod=14), equal_nan=True)
+    lead = np.r_[np.nan, np.nan, close]
+    np.testing.assert_allclose(indicators.rsi(lead, 14), talib.RSI(lead, timeperiod=14), equal_nan=True)
+
+
+def test_fallbacks_match_kernels(monkeypatch):
+    close = _close()
+    # Leading NaNs only, and leading NaNs followed by the gaps in ``_close``.
+    lead = np.r_[np.nan, np.nan, close[250:]]
+    gappy = np.r_[np.nan, np.nan, close[30:]]
+
+    def compute():
+        return [
+            indicators.sma(close, 20), indicators.ema(close, 50), indicators.rsi(close[250:], 14),
+            indicators.rsi(lead, 14), [indicators.rsi_last(lead, 14)], indicators.rsi(gappy, 14),
+        ]
+
+    jitted = compute()
+    monkeypatch.setattr(indicators, "HAS_NUMBA", False)
+    for a, b in zip(jitted, compute()):
+        np.testing.assert_allclose(a, b, equal_nan=True)
+
+
+def test_rsi_nan_handling():
+    close = _close()[250:]
+    rsi = indicators.rsi(np.r_[np.nan, np.nan, close], 14)
+    np.testing.assert_allclose(rsi[2:], indicators.rsi(close, 14), equal_nan=True)
+    gap = np.r_[close[:100], np.nan, close[100:]]
+    assert np.isnan(indicators.rsi(gap, 14)[100:]).all()
+    assert np.isnan(indicators.rsi_last(gap, 14))
+    live = indicators.IncrementalWilderRSI(14)
+    np.testing.assert_allclose([live.update(x) for x in gap], indicators.rsi(gap, 14), equal_nan=True)
+
+
+def test_zigzag_alternates_pivots():
+    close = np.array([100.0, 101.0, 103.0, 102.0, 100.5, 100.0, 103.0])
+    pivots = indicators.zigzag(close, 2.0)
+    np.testing.assert_array_equal(np.flatnonzero(~np.isnan(pivots)), [2, 4, 6])
+
+
+def test_smoothed_ma_matches_chained_ewm():
+    close = _close()
+    expected = pd.Series(close)
+    for _ in range(5):
+        expected = expected.ewm(span=13, adjust=False).mean()
+    np.testing.assert_allclose(indicators.smoothed_ma(close, 13, 5), expected.to_numpy(), equal_nan=True)
+
+
+def test_rsi_last_matches_full_series():
+    close = _close()[250:]
+    assert indicators.rsi_last(close, 14) == pytest.approx(indicators.rsi(close, 14)[-1])
+
+
+def test_tail_helpers_match_full_series(monkeypatch):
+    close = _close()
+    np.testing.assert_allclose(indicators.ema_tail(close, 50, 2), indicators.ema(close, 50)[-2:])
+    expected = indicators.smoothed_ma(close, 13, 5)[-1]
+    assert indicators.smoothed_ma_last(close, 13, 5) == pytest.approx(expected)
+    fused = indicators.sma_ema_tail(close[250:], 20, 50)
+    sma, ema = indicators.sma(close[250:], 20), indicators.ema(close[250:], 50)
+    np.testing.assert_allclose(fused, [sma[-2], ema[-2], sma[-1], ema[-1]])
+    monkeypatch.setattr(indicators, "HAS_NUMBA", False)
+    assert indicators.smoothed_ma_last(close, 13, 5) == pytest.approx(expected)
+    np.testing.assert_allclose(indicators.sma_ema_tail(close[250:], 20, 50), fused)
@@ -0,0 +1,34 @@
+import pandas as pd
+from src.igfx_bot.data import CachedMarketData
+
+class FakeIG:
+    def __init__(self):
+        self.times = pd.date_range("2024-01-01", periods=1000, freq="5min")
+        self.end = 500
+        self.requests = []
+
+    def fetch_historical_prices_by_epic_and_num_points(self, epic, resolution, n, session=None):
+        self.requests.append(n)
+        rows = []
+        for i in range(self.end - n, self.end):
+            close = float(i) + (0.5 if i == self.end - 1 else 0.0)  # forming candle
+            rows.append({
+                "snapshotTime": str(self.times[i]),
+                "openPrice": {"bid": float(i)}, "highPrice": {"bid": float(i)},
+                "lowPrice": {"bid": float(i)}, "closePrice": {"bid": close},
+                "lastTradedVolume": 1,
+            })
+        return {"prices": rows}
+
+def test_cached_market_data_fetches_only_new_bars():
+    ig = FakeIG()
+    md = CachedMarketData(ig)
+    first = md.fetch_historical("CS.D.EURUSD.MINI.IP", "MINUTE_5", n=400)
+    ig.end += 1
+    second = md.fetch_historical("CS.D.EURUSD.MINI.IP", "MINUTE_5", n=400)
+    assert ig.requests[0] == 400 and ig.requests[1] < 10
+    assert len(first) == len(second) == 400
+    assert list(second.index) == list(range(400))
+    # The previously forming candle is replaced by its closed version.
+    assert second["close"].iloc[-2:].tolist() == [499.0, 500.5]
+    assert second["time"].is_monotonic_increasing and second["time"].is_unique
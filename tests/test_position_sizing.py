@@ -1,6 +1,18 @@
+import numpy as np
 from src.igfx_bot.risk import RiskConfig, RiskManager
 
 def test_position_sizing_basic():
     rm = RiskManager(RiskConfig(balance=10000, risk_per_trade_pct=1.0))
     size = rm.position_size(entry=1.1000, stop=1.0990, pip_size=0.0001, lot_size=10000)
     assert size > 0
+
+def test_position_size_batch_matches_scalar():
+    rm = RiskManager(RiskConfig(balance=10000, risk_per_trade_pct=1.0))
+    rng = np.random.default_rng(0)
+    entries = 1.1 + rng.normal(0, 0.01, 1000)
+    stops = entries - rng.uniform(-0.005, 0.005, 1000)
+    stops[:3] = entries[:3]
+    sizes = rm.position_size_batch(entries, stops, pip_size=0.0001, lot_size=1000)
+    expected = [rm.position_size(e, s, pip_size=0.0001, lot_size=1000) for e, s in zip(entries, stops)]
+    np.testing.assert_array_equal(sizes, expected)
+    assert (sizes[:3] == 0).all()
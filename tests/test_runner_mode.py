@@ -20,7 +20,7 @@ def test_resolve_ig_env_names_mode_specific_overrides():
         },
     }
 
-    env_names = runner._resolve_ig_env_names(ig_cfg, "LIVE")
+    env_names = runner._resolve_ig_env_names(runner._freeze(ig_cfg), "LIVE")
 
     assert env_names["api_key_env"] == "IG_API_KEY_LIVE"
     assert env_names["username_env"] == "IG_USERNAME_LIVE"
@@ -35,8 +35,48 @@ def test_resolve_ig_env_names_uses_top_level_defaults():
         "password_env": "IG_PASSWORD",
     }
 
-    env_names = runner._resolve_ig_env_names(ig_cfg, "DEMO")
+    env_names = runner._resolve_ig_env_names(runner._freeze(ig_cfg), "DEMO")
 
     assert env_names["api_key_env"] == "IG_API_KEY"
     assert env_names["username_env"] == "IG_USERNAME"
     assert env_names["password_env"] == "IG_PASSWORD"
+
+
+def test_frozen_dict_and_pairs_are_distinct_cache_keys():
+    as_dict = runner._freeze({"credentials": {"LIVE": {"api_key_env": "IG_API_KEY_LIVE"}}})
+    as_pairs = runner._freeze({"credentials": [["LIVE", [["api_key_env", "IG_API_KEY_LIVE"]]]]})
+
+    assert as_dict != as_pairs
+    assert len({as_dict, as_pairs}) == 2
+
+
+def test_job_fetches_instruments_concurrently():
+    import asyncio
+    import threading
+
+    import pandas as pd
+
+    from src.igfx_bot.risk import RiskConfig, RiskManager
+
+    specs = [
+        runner.InstrumentSpec.from_config({"symbol": f"S{i}", "ig_epic": f"E{i}", "pip_size": 0.0001, "lot_size": 1}) for i in range(4)
+    ]
+    # Every fetch waits for all the others, so it only returns if they overlap.
+    barrier = threading.Barrier(len(specs), timeout=5)
+    fetched = []
+
+    class MarketData:
+        def fetch_historical(self, epic, resolution, n):
+            barrier.wait()
+            fetched.append(epic)
+            return pd.DataFrame()
+
+    strategies = {spec.symbol: runner.build_strategy("sma_ema_crossover", {}) for spec in specs}
+    asyncio.run(
+        runner.job(
+            {}, MarketData(), None, RiskManager(RiskConfig(balance=10000)),
+            strategies=strategies, instruments=specs,
+        )
+    )
+
+    assert sorted(fetched) == ["E0", "E1", "E2", "E3"]
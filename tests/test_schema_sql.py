@@ -0,0 +1,21 @@
+from pathlib import Path
+
+from src.igfx_bot import db
+from src.igfx_bot.trade_sql import PNL_JSON_PATHS
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "init_timescale.sql"
+
+
+def _squash(sql):
+    return " ".join(sql.split())
+
+
+def test_init_script_matches_trades_daily_definition():
+    script = _squash(SCRIPT.read_text(encoding="utf-8"))
+    assert _squash(db.TRADES_DAILY_SQL) in script
+    assert "CALL refresh_continuous_aggregate('trades_daily', NULL, NULL);" in script
+
+
+def test_trades_daily_sums_every_pnl_path():
+    for path in PNL_JSON_PATHS:
+        assert f"'{{{path}}}'" in db.TRADES_DAILY_SQL
@@ -1,8 +1,82 @@
-import pandas as pd
-from src.igfx_bot.strategies.sma_ema_crossover import SMAEMACrossover
+import numpy as np
+import pytest
 
-def test_sma_ema_signal_types():
-    df = pd.DataFrame({"close": [i for i in range(1,300)]})
-    s = SMAEMACrossover(fast=5, slow=10)
-    sig = s.generate(df)
+# pandas and the strategies are imported inside the tests that use them, so
+# collecting this module stays cheap.
+
+@pytest.mark.parametrize("fast,slow", [(5, 10), (12, 26), (50, 200)])
+def test_sma_ema_signal_types(fast, slow, close_df):
+    from src.igfx_bot.strategies.sma_ema_crossover import SMAEMACrossover
+    sig = SMAEMACrossover(fast=fast, slow=slow).generate(close_df)
     assert sig.side in ('BUY','SELL','FLAT')
+
+def test_sma_ema_generate_accepts_close_array(close_df, sma_ema_strategy):
+    close = np.arange(1, 300, dtype=np.float64)
+    assert sma_ema_strategy.generate(close) == sma_ema_strategy.generate(close_df)
+
+def test_sma_ema_generate_reads_close_from_ohlcv_frame(close_df, sma_ema_strategy):
+    import pandas as pd
+    close = close_df["close"].to_numpy()
+    # A frame backed by one C-ordered 2-D array: its columns are strided views.
+    ohlcv = pd.DataFrame(
+        np.column_stack([close, close + 0.5, close - 0.5, close, np.ones_like(close)]),
+        columns=["open", "high", "low", "close", "volume"],
+    )
+    assert sma_ema_strategy.generate(ohlcv) == sma_ema_strategy.generate(close_df)
+
+def test_sma_ema_generate_series_matches_generate():
+    from src.igfx_bot.strategies.sma_ema_crossover import SMAEMACrossover
+    full = _candles()
+    s = SMAEMACrossover(fast=5, slow=20)
+    codes = s.generate_series(full)
+    assert codes.dtype == np.int8
+    sides = {1: "BUY", -1: "SELL", 0: "FLAT"}
+    assert [sides[c] for c in codes.tolist()] == [s.generate(full.iloc[:k]).side for k in range(1, len(full) + 1)]
+    assert {1, -1} <= set(codes.tolist())
+
+def test_update_from_warmup_matches_generate():
+    from src.igfx_bot.strategies.sma_ema_crossover import SMAEMACrossover
+    close = _candles()["close"].to_numpy()
+    s = SMAEMACrossover(fast=5, slow=20)
+    state = s.warmup(close[:100])
+    for k in range(101, len(close) + 1):
+        _, sig = s.update_from(state, close[100:k])
+        assert sig == s.generate(close[:k])
+    # Snapshots chain: continuing from new_state equals one longer tail.
+    mid, _ = s.update_from(state, close[100:200])
+    assert s.update_from(mid, close[200:])[1] == s.generate(close)
+
+def _candles(n=300, seed=3):
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0015, n))
+    return pd.DataFrame({
+        "time": pd.date_range("2024-01-01", periods=n, freq="5min"),
+        "open": close, "high": close + 0.0005, "low": close - 0.0005, "close": close,
+    })
+
+def test_incremental_step_matches_generate():
+    from src.igfx_bot.strategies.alligator import Alligator
+    from src.igfx_bot.strategies.rsi_reversal import RSIReversal
+    from src.igfx_bot.strategies.sma_ema_crossover import SMAEMACrossover
+    full = _candles()
+    for make in (lambda: SMAEMACrossover(fast=5, slow=20), lambda: RSIReversal(), lambda: Alligator()):
+        live, seen = make(), []
+        for k in range(1, len(full) + 1):
+            df = full.iloc[:k]
+            # The forming candle is first seen with a provisional close.
+            forming = df.copy()
+            forming.iloc[-1, forming.columns.get_loc("close")] += 0.001
+            live.step(forming)
+            seen.append(live.step(df).side)
+        expected = [make().generate(full.iloc[:k]).side for k in range(1, len(full) + 1)]
+        assert seen == expected
+        assert {"BUY", "SELL"} & set(seen)
+
+def test_alligator_rejects_close_only_data():
+    from src.igfx_bot.strategies.alligator import Alligator
+    close = _candles()["close"].to_numpy()
+    with pytest.raises(ValueError, match="high and low"):
+        Alligator().generate(close)
+    with pytest.raises(ValueError, match="high and low"):
+        Alligator().warmup(close)